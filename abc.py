@@ -1,17 +1,17 @@
 import streamlit as st
 import os
+import hashlib
 import docx
-import re
-import base64
 from io import BytesIO
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-import PyPDF2
-import tempfile
 import shutil
-import markdown
-from weasyprint import HTML
-import subprocess
+
+from utils.file_utils import get_download_mime_type
+from utils.document_utils import extract_text_from_file, process_zip_file
+from utils.ranking_utils import ResumeCorpus, rank_resumes
+from utils.pdf_utils import extract_pdf_text, get_pdf_extraction_stats
+from utils.export_utils import create_export_bundle, get_render_service
+from utils.template_utils import get_template_registry
+from utils.jd_utils import coverage_matrix, get_jd_analyzer, match_resume_to_jd
 
 # Set page configuration
 st.set_page_config(
@@ -98,6 +98,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Name shown at the top of generated documents
+RESUME_TITLE = "SURYA NERSU"
+
 # Initialize session state variables
 if 'jd_text' not in st.session_state:
     st.session_state.jd_text = ""
@@ -119,24 +122,14 @@ if 'improvement_guidance' not in st.session_state:
     st.session_state.improvement_guidance = ""
 
 
-# Load resume templates from resources
+# Load resume templates from resources (kept in memory; re-read with Reload Templates)
 def load_resume_templates():
-    templates = {}
-    template_files = {
-        "hr_focused": "/home/ubuntu/resume_app/resources/hr_focused_resume.md",
-        "semi_technical": "/home/ubuntu/resume_app/resources/semi_technical_resume.md",
-        "design_oriented": "/home/ubuntu/resume_app/resources/design_oriented_resume.md",
-        "ai_architecture": "/home/ubuntu/resume_app/resources/ai_architecture_resume.md"
-    }
+    return get_template_registry().templates()
 
-    for format_type, file_path in template_files.items():
-        try:
-            with open(file_path, 'r') as f:
-                templates[format_type] = f.read()
-        except Exception as e:
-            templates[format_type] = f"Error loading template: {str(e)}"
 
-    return templates
+# Re-read templates edited on disk; otherwise they are served from memory
+if st.sidebar.button("Reload Templates"):
+    get_template_registry().reload()
 
 
 # Function to extract text from DOCX
@@ -149,68 +142,27 @@ def extract_text_from_docx(file):
 
 
 # Function to extract text from PDF using poppler-utils
-def extract_text_from_pdf(file):
+def extract_text_from_pdf(file, layout=False, first_page=None, last_page=None):
+    # Accepts a path, an uploaded file or PDF bytes; pdftotext runs over pipes with a
+    # timeout, falling back to PyPDF2 if it fails
     try:
-        # First try using pdftotext from poppler-utils
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.txt') as temp_txt:
-            temp_txt_path = temp_txt.name
-
-        # Run pdftotext command
-        subprocess.run(['pdftotext', file, temp_txt_path], check=True)
-
-        # Read the extracted text
-        with open(temp_txt_path, 'r') as f:
-            text = f.read()
-
-        # Clean up
-        os.unlink(temp_txt_path)
+        if isinstance(file, bytes):
+            content = file
+        elif hasattr(file, 'read'):
+            content = file.read()
+        else:
+            with open(file, 'rb') as f:
+                content = f.read()
 
-        return text
+        return extract_pdf_text(content, layout, first_page, last_page)[0]
     except Exception as e:
-        # Fallback to PyPDF2 if poppler-utils fails
-        try:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                text += pdf_reader.pages[page_num].extract_text()
-            return text
-        except Exception as e2:
-            return f"Error extracting PDF text: {str(e2)}"
+        return f"Error extracting PDF text: {str(e)}"
 
 
 # Function to create DOCX from text
 def create_docx_from_text(text, format_type):
-    doc = docx.Document()
-
-    # Add title
-    title = doc.add_paragraph()
-    title_run = title.add_run("SURYA NERSU")
-    title_run.bold = True
-    title_run.font.size = Pt(16)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Process text by paragraphs
-    paragraphs = text.split('\n')
-    for para in paragraphs:
-        if para.strip():
-            if para.startswith('## '):
-                p = doc.add_paragraph()
-                run = p.add_run(para[3:])
-                run.bold = True
-                run.font.size = Pt(14)
-            elif para.startswith('### '):
-                p = doc.add_paragraph()
-                run = p.add_run(para[4:])
-                run.bold = True
-                run.font.size = Pt(12)
-            elif para.startswith('- '):
-                p = doc.add_paragraph(para[2:], style='List Bullet')
-            else:
-                p = doc.add_paragraph(para)
-
-    # Save to BytesIO
-    docx_io = BytesIO()
-    doc.save(docx_io)
+    # Built from a preloaded template with predefined styles; repeat requests come from the cache
+    docx_io = BytesIO(get_render_service().render_docx(text, format_type, RESUME_TITLE))
     docx_io.seek(0)
 
     return docx_io
@@ -218,175 +170,62 @@ def create_docx_from_text(text, format_type):
 
 # Function to create PDF from text
 def create_pdf_from_text(text, format_type):
-    # Convert markdown to HTML
-    html_content = markdown.markdown(text)
-
-    # Add basic styling
-    styled_html = f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; }}
-            h1 {{ text-align: center; font-size: 18pt; }}
-            h2 {{ font-size: 16pt; margin-top: 20px; }}
-            h3 {{ font-size: 14pt; }}
-            p {{ font-size: 12pt; line-height: 1.5; }}
-            ul {{ padding-left: 20px; }}
-            li {{ margin-bottom: 5px; }}
-            .center {{ text-align: center; }}
-        </style>
-    </head>
-    <body>
-        {html_content}
-    </body>
-    </html>
-    '''
-
-    # Generate PDF to BytesIO
-    pdf_io = BytesIO()
-    HTML(string=styled_html).write_pdf(pdf_io)
+    # Rendered in the process pool with a shared stylesheet; repeat requests come from the cache.
+    # This waits for the render; the page itself uses submit_pdf_render and checks back instead.
+    pdf_io = BytesIO(get_render_service().render_pdf(text, format_type))
     pdf_io.seek(0)
 
     return pdf_io
 
 
-# Function to create download link
-def get_binary_file_downloader_html(bin_file, file_label, file_extension):
-    bin_file.seek(0)
-    data = bin_file.read()
-    b64 = base64.b64encode(data).decode()
-    href = f'<a href="data:application/{file_extension};base64,{b64}" download="{file_label}.{file_extension}" class="download-button">Download {file_label}</a>'
-    return href
+# Function to identify the resume a prepared download or background PDF render belongs to
+def download_content_key(text, format_type):
+    return hashlib.sha1(f"{format_type}\0{text}".encode('utf-8')).hexdigest()
+
+
+# Function to start a PDF render in the background and keep it in session state
+def submit_pdf_render(text, format_type, body_html=None):
+    # The render runs in the process pool; later reruns check the future instead of waiting on it
+    render_key = download_content_key(text, format_type)
+    render = st.session_state.get('pdf_render')
+    if render is None or render[0] != render_key:
+        render = st.session_state.pdf_render = (render_key, get_render_service().submit_pdf(text, format_type, body_html))
+    return render[1]
+
+
+# Function to show a download button that generates the file only when requested
+def file_download_button(generate, file_label, file_extension, content_key):
+    # generate() returns a BytesIO and runs on the first click. The bytes are kept in session
+    # state until content_key changes, and Streamlit serves them as a binary download
+    # rather than embedding them in the page.
+    filename = f"{file_label}.{file_extension}"
+    state_key = f"download_{filename}"
+    prepared = st.session_state.get(state_key)
+    if prepared is None or prepared[0] != content_key:
+        if not st.button(f"Prepare {file_label}", key=f"prepare_{filename}"):
+            return
+        bin_file = generate()
+        bin_file.seek(0)
+        prepared = st.session_state[state_key] = (content_key, bin_file.read())
+    st.download_button(f"Download {file_label}", prepared[1], file_name=filename, mime=get_download_mime_type(filename), key=f"save_{filename}")
 
 
 # Function to analyze JD and extract key requirements
+@st.cache_data(max_entries=64)
 def analyze_jd(jd_text):
-    # Extract skills (simplified version)
-    skills_pattern = r'(?:skills|requirements|qualifications|experience with|proficiency in|knowledge of)(?:[^\n]*)((?:[\s]*[-•][\s]*[^\n]+[\n]?)+)'
-    skills_matches = re.findall(skills_pattern, jd_text.lower(), re.IGNORECASE)
-
-    skills = []
-    for match in skills_matches:
-        skill_items = re.findall(r'[-•][\s]*([^\n]+)', match)
-        skills.extend([item.strip() for item in skill_items if item.strip()])
-
-    # Extract years of experience
-    exp_pattern = r'(\d+\+?)\s*(?:years|yrs)(?:\s*of)?\s*(?:experience|exp)'
-    exp_matches = re.findall(exp_pattern, jd_text.lower())
-    experience_req = exp_matches[0] if exp_matches else "Not specified"
-
-    # Extract education
-    edu_pattern = r'(?:degree|bachelor|master|phd|bs|ms|b\.s\.|m\.s\.)(?:[^\n]*)((?:[\s]*[-•][\s]*[^\n]+[\n]?)+)'
-    edu_matches = re.findall(edu_pattern, jd_text.lower(), re.IGNORECASE)
-
-    education = []
-    for match in edu_matches:
-        edu_items = re.findall(r'[-•][\s]*([^\n]+)', match)
-        education.extend([item.strip() for item in edu_items if item.strip()])
-
-    # Extract key technologies
-    tech_keywords = [
-        "python", "java", "javascript", "c#", "c++", "ruby", "go", "rust", "php",
-        "aws", "azure", "gcp", "cloud", "kubernetes", "docker", "terraform",
-        "react", "angular", "vue", "node", "django", "flask", "spring", "asp.net",
-        "sql", "nosql", "mongodb", "postgresql", "mysql", "oracle", "database",
-        "machine learning", "ml", "ai", "artificial intelligence", "deep learning", "neural network",
-        "data science", "big data", "hadoop", "spark", "kafka", "data engineering",
-        "devops", "ci/cd", "jenkins", "github actions", "gitlab ci", "automation",
-        "agile", "scrum", "kanban", "jira", "product management", "project management",
-        "microservices", "rest api", "graphql", "serverless", "lambda", "function",
-        "security", "encryption", "authentication", "authorization", "oauth",
-        "mobile", "ios", "android", "react native", "flutter", "xamarin",
-        "testing", "qa", "quality assurance", "unit testing", "integration testing",
-        "blockchain", "ethereum", "smart contract", "web3", "cryptocurrency",
-        "llm", "large language model", "gpt", "bert", "transformer", "nlp",
-        "computer vision", "cv", "image processing", "object detection",
-        "rag", "retrieval augmented generation", "vector database", "embedding",
-        "langchain", "langgraph", "multi-agent", "agent", "orchestration",
-        "fine-tuning", "qlora", "lora", "prompt engineering",
-        "kubernetes", "k8s", "container", "docker", "microservice",
-        "observability", "monitoring", "logging", "grafana", "prometheus",
-        "mlops", "ml engineering", "model deployment", "model serving",
-        "data pipeline", "etl", "elt", "data transformation", "data lake", "data warehouse",
-        "vector search", "vector store", "redis", "pgvector", "pinecone", "weaviate",
-        "hipaa", "gdpr", "compliance", "regulated", "pii", "phi", "redaction",
-        "salesforce", "sfdc", "crm", "customer relationship management"
-    ]
-
-    technologies = []
-    for keyword in tech_keywords:
-        if re.search(r'\b' + re.escape(keyword) + r'\b', jd_text.lower()):
-            technologies.append(keyword)
-
-    # Extract job title
-    title_patterns = [
-        r'job title:?\s*([^\n]+)',
-        r'position:?\s*([^\n]+)',
-        r'role:?\s*([^\n]+)',
-        r'^([^:]+(?:engineer|developer|architect|scientist|analyst|manager|director|lead|head|chief|vp|president|officer|specialist|consultant|advisor))[\s\n]'
-    ]
-
-    job_title = "Not specified"
-    for pattern in title_patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE | re.MULTILINE)
-        if matches:
-            job_title = matches[0].strip()
-            break
-
-    # Extract company name
-    company_patterns = [
-        r'(?:at|with|for|join)\s+([A-Z][A-Za-z0-9\s&]+)(?:[\.,]|\s+is|\s+as|\s+to)',
-        r'about\s+([A-Z][A-Za-z0-9\s&]+)(?:[\.,]|\s+is|\s+as|\s+to)',
-        r'([A-Z][A-Za-z0-9\s&]+)\s+is\s+(?:looking|seeking|hiring)',
-    ]
-
-    company_name = "Not specified"
-    for pattern in company_patterns:
-        matches = re.findall(pattern, jd_text)
-        if matches:
-            company_name = matches[0].strip()
-            break
-
-    return {
-        "job_title": job_title,
-        "company_name": company_name,
-        "skills": skills,
-        "technologies": technologies,
-        "experience": experience_req,
-        "education": education
-    }
+    # Precompiled, single-pass analyzer; cached so reruns with the same JD do no work
+    return get_jd_analyzer().analyze(jd_text)
 
 
 # Function to perform gap analysis
 def perform_gap_analysis(jd_analysis, resume_text):
-    missing_skills = []
-    matching_skills = []
-
-    # Check for skills
-    for skill in jd_analysis["skills"]:
-        if skill.strip() and skill.strip().lower() not in resume_text.lower():
-            missing_skills.append(skill.strip())
-        else:
-            matching_skills.append(skill.strip())
-
-    # Check for technologies
-    missing_tech = []
-    matching_tech = []
-    for tech in jd_analysis["technologies"]:
-        if tech.strip() and tech.strip().lower() not in resume_text.lower():
-            missing_tech.append(tech.strip())
-        else:
-            matching_tech.append(tech.strip())
-
-    # Calculate match percentage
-    total_skills = len(jd_analysis["skills"]) + len(jd_analysis["technologies"])
-    matching_count = len(matching_skills) + len(matching_tech)
-
-    match_percentage = 0
-    if total_skills > 0:
-        match_percentage = round((matching_count / total_skills) * 100)
+    # resume_text may also be a ResumeDocument; it is indexed once, so every check is a lookup
+    match = match_resume_to_jd(resume_text, jd_analysis)
+    missing_skills = match["missing_skills"]
+    matching_skills = match["matching_skills"]
+    missing_tech = match["missing_tech"]
+    matching_tech = match["matching_tech"]
+    match_percentage = match["match_percentage"]
 
     analysis = f"""
 ## Gap Analysis
@@ -458,4 +297,131 @@ def generate_improvement_guidance(missing_skills, matching_skills, resume_format
                 guidance += """
  - Mention relevant ML projects
  - Include frameworks like TensorFlow, PyTorch, etc.
-"""
\ No newline at end of file
+"""
+
+# Batch resume ranking against a job description
+st.markdown("---")
+st.markdown('<div class="sub-header">Batch Resume Ranking</div>', unsafe_allow_html=True)
+
+ranking_zip = st.file_uploader("Upload a ZIP of resumes to rank", type="zip", key="ranking_zip")
+ranking_jd = st.text_area("Job description to rank against", value=st.session_state.jd_text, height=200, key="ranking_jd")
+ranking_top_k = st.number_input("Number of top resumes to show", min_value=1, max_value=1000, value=20, key="ranking_top_k")
+
+if ranking_zip is not None:
+    # Vectorize the uploaded resumes once; reruns reuse the corpus until a new ZIP is uploaded
+    zip_content = ranking_zip.getvalue()
+    corpus_key = hashlib.sha1(zip_content).hexdigest()
+    if st.session_state.get('ranking_corpus_key') != corpus_key:
+        with st.spinner("Extracting and vectorizing resumes..."):
+            resumes = process_zip_file(zip_content, {})
+            st.session_state.ranking_corpus = ResumeCorpus(list(resumes.keys()), list(resumes.values()))
+            st.session_state.ranking_corpus_key = corpus_key
+    st.info(f"{len(st.session_state.ranking_corpus)} resumes ready for ranking")
+
+    if st.button("Rank Resumes") and ranking_jd.strip():
+        ranking = rank_resumes(st.session_state.ranking_corpus, ranking_jd, int(ranking_top_k))
+        if not ranking:
+            st.warning("No resumes could be extracted from the ZIP file.")
+        for result in ranking:
+            with st.expander(f"#{result['rank']} {result['name']} - score {result['score']:.2f}, {round(result['skill_coverage'] * 100)}% skill coverage"):
+                st.markdown("**Matched skills:** " + " ".join(f"<span class='skill-match'>{skill}</span>" for skill in result['matched_skills']), unsafe_allow_html=True)
+                st.markdown("**Missing skills:** " + " ".join(f"<span class='skill-missing'>{skill}</span>" for skill in result['missing_skills']), unsafe_allow_html=True)
+
+# Coverage grid of many resumes against many job descriptions
+st.markdown("---")
+st.markdown('<div class="sub-header">Resume Coverage Matrix</div>', unsafe_allow_html=True)
+
+coverage_zip = st.file_uploader("Upload a ZIP of resumes", type="zip", key="coverage_zip")
+coverage_jd_files = st.file_uploader("Upload job descriptions", type=["txt", "md", "docx", "pdf"], accept_multiple_files=True, key="coverage_jds")
+
+if coverage_zip is not None and coverage_jd_files and st.button("Build Coverage Matrix"):
+    with st.spinner("Analyzing resumes and job descriptions..."):
+        resumes = process_zip_file(coverage_zip.getvalue(), {})
+        jd_names = [jd_file.name for jd_file in coverage_jd_files]
+        jd_analyses = [analyze_jd(extract_text_from_file(jd_file.getvalue(), jd_file.name) or "") for jd_file in coverage_jd_files]
+        matrix = coverage_matrix(list(resumes.values()), jd_analyses)
+
+    if not resumes:
+        st.warning("No resumes could be extracted from the ZIP file.")
+    else:
+        st.markdown("Percentage of each job description's skills and technologies found in each resume:")
+        st.dataframe([
+            dict([("Resume", resume_name)] + [(jd_name, match["match_percentage"]) for jd_name, match in zip(jd_names, row)])
+            for resume_name, row in zip(resumes, matrix)
+        ])
+
+# Download the current resume format; the PDF renders in the background while the page stays usable
+st.markdown("---")
+st.markdown('<div class="sub-header">Download Resume</div>', unsafe_allow_html=True)
+
+download_format = st.session_state.resume_format
+download_templates, download_errors = get_template_registry().loaded_templates()
+if st.session_state.generated_resume:
+    download_text, download_html = st.session_state.generated_resume, None
+elif download_format in download_templates:
+    download_text = download_templates[download_format]
+    download_html = get_template_registry().get_html(download_format)
+else:
+    download_text = download_html = None
+
+if download_text is not None:
+    # The DOCX is only generated when Prepare is clicked
+    file_download_button(lambda: create_docx_from_text(download_text, download_format), f"{download_format}_resume", "docx",
+                         download_content_key(download_text, download_format))
+if st.button("Render PDF"):
+    if download_text is None:
+        st.warning(f"No resume to download: the {download_format} template could not be loaded ({download_errors.get(download_format)})")
+    else:
+        submit_pdf_render(download_text, download_format, download_html)
+
+pdf_render = st.session_state.get('pdf_render')
+if download_text is not None and pdf_render is not None and pdf_render[0] == download_content_key(download_text, download_format):
+    pdf_future = pdf_render[1]
+    if not pdf_future.done():
+        st.info("The PDF is rendering in the background. Check back when you're ready.")
+        st.button("Check PDF")
+    elif pdf_future.exception() is not None:
+        st.warning(f"Could not render the PDF: {pdf_future.exception()}")
+    else:
+        st.download_button("Download PDF", pdf_future.result(), file_name=f"{download_format}_resume.pdf", mime="application/pdf")
+
+# Export every resume format in every file type as one ZIP
+st.markdown("---")
+st.markdown('<div class="sub-header">Export All Formats</div>', unsafe_allow_html=True)
+
+if st.button("Export All"):
+    export_documents, template_errors = get_template_registry().loaded_templates()
+    for format_type, error in template_errors.items():
+        st.warning(f"Skipping the {format_type} template: {error}")
+    # Templates are rendered from the registry's precompiled HTML; a generated resume is converted when rendered
+    export_html = {format_type: get_template_registry().get_html(format_type) for format_type in export_documents}
+    if st.session_state.generated_resume:
+        export_documents[st.session_state.resume_format] = st.session_state.generated_resume
+        export_html.pop(st.session_state.resume_format, None)
+
+    # The previous bundle's temporary file is replaced
+    previous_bundle = st.session_state.get('export_bundle_path')
+    st.session_state.export_bundle_path = None
+    if previous_bundle and os.path.exists(previous_bundle):
+        os.remove(previous_bundle)
+
+    if not export_documents:
+        st.warning("There are no resumes to export.")
+    else:
+        with st.spinner("Rendering all formats..."):
+            bundle_path, export_errors = create_export_bundle(export_documents, RESUME_TITLE, html_documents=export_html)
+        st.session_state.export_bundle_path = bundle_path
+        for filename, error in export_errors:
+            st.warning(f"Could not render {filename}: {error}")
+
+bundle_path = st.session_state.get('export_bundle_path')
+if bundle_path and os.path.exists(bundle_path):
+    # The ZIP was streamed to disk as renders finished; it is handed over as a file
+    with open(bundle_path, 'rb') as bundle_file:
+        st.download_button("Download All Formats (ZIP)", bundle_file, file_name="resumes.zip", mime="application/zip")
+
+# PDF extraction latency by engine
+pdf_extraction_stats = get_pdf_extraction_stats()
+for engine, stats in pdf_extraction_stats.items():
+    if stats['count']:
+        st.sidebar.caption(f"PDF extraction ({engine}): {stats['count']} files, {stats['mean_ms']:.0f} ms average")
@@ -4,14 +4,18 @@ import tempfile
 import shutil
 import zipfile
 import difflib
-import base64
 from pathlib import Path
 
 # Import utility modules
-from utils.diff_utils import get_diff_lines, highlight_code, generate_diff_html, apply_changes, apply_selective_changes
-from utils.file_utils import create_download_link, save_to_project_folder, get_file_extension, is_text_file, get_common_filename
-from utils.document_utils import extract_text_from_file, process_zip_file, is_binary_file, is_resume
-from utils.resume_utils import compare_resume_sections, generate_resume_diff_html, compare_resume_skills, generate_skills_comparison_html
+from utils.diff_utils import diff_files, get_diff_lines, highlight_code, generate_diff_html, apply_changes, apply_selective_changes
+from utils.file_utils import get_download_mime_type, save_to_project_folder, get_file_extension, is_text_file, get_common_filename
+from utils.document_utils import extract_text_from_file, process_zip_file, is_binary_file, is_extraction_error, is_resume, slides_to_text
+from utils.extraction_pool import ExtractionError, ExtractionTimeoutError, run_isolated_extraction
+from utils.resume_utils import ResumeDocument, compare_resume_sections, generate_resume_diff_html, compare_resume_skills, generate_skills_comparison_html
+from utils.slide_utils import compare_slides, generate_slide_diff_html
+from utils.metrics_utils import latency_snapshot
+from utils.dedup_utils import find_near_duplicates
+from utils.cache_utils import LRUCache, content_hash
 
 # Set page configuration
 st.set_page_config(
@@ -80,6 +84,10 @@ if 'diff_lines' not in st.session_state:
     st.session_state.diff_lines = []
 if 'is_resume_comparison' not in st.session_state:
     st.session_state.is_resume_comparison = False
+if 'left_slides' not in st.session_state:
+    st.session_state.left_slides = {}
+if 'right_slides' not in st.session_state:
+    st.session_state.right_slides = {}
 
 # Function to handle individual file upload
 def handle_file_upload(uploaded_file, target_dict, file_key):
@@ -91,9 +99,25 @@ def handle_file_upload(uploaded_file, target_dict, file_key):
             target_dict = process_zip_file(content, target_dict)
             return target_dict, list(target_dict.keys())[0] if target_dict else None
         
+        # Keep slide structure for PowerPoint files so decks can be compared slide by slide
+        extracted_text = None
+        if get_file_extension(uploaded_file.name) == '.pptx':
+            try:
+                slides = run_isolated_extraction('pptx_slides', content)
+                st.session_state[f"{file_key}_slides"][uploaded_file.name] = slides
+                extracted_text = slides_to_text(slides)
+            except ExtractionTimeoutError as e:
+                st.error(f"File {uploaded_file.name} could not be processed: {str(e)}")
+                return target_dict, None
+            except ExtractionError:
+                pass
+        
         # Extract text from the file
-        extracted_text = extract_text_from_file(content, uploaded_file.name)
+        if extracted_text is None:
+            extracted_text = extract_text_from_file(content, uploaded_file.name)
         if extracted_text is not None:
+            if is_extraction_error(extracted_text):
+                st.warning(extracted_text)
             target_dict[uploaded_file.name] = extracted_text
             return target_dict, uploaded_file.name
         else:
@@ -101,6 +125,31 @@ def handle_file_upload(uploaded_file, target_dict, file_key):
             return target_dict, None
     return target_dict, None
 
+# Resume analysis results shared across reruns and sessions, keyed by document content
+@st.cache_resource
+def get_resume_analysis_cache():
+    return LRUCache(maxsize=32)
+
+# Function to analyze a pair of documents as resumes, reusing cached results for unchanged inputs
+def analyze_resume_pair(left_filename, left_text, right_filename, right_text):
+    def analyze():
+        # Each document is parsed once and shared by every resume feature
+        left_document = ResumeDocument(left_text, left_filename)
+        right_document = ResumeDocument(right_text, right_filename)
+        analysis = {
+            'is_resume_comparison': is_resume(left_filename, left_document) and is_resume(right_filename, right_document),
+            'resume_diff_html': None,
+            'skills_html': None
+        }
+        if analysis['is_resume_comparison']:
+            section_comparisons = compare_resume_sections(left_document, right_document)
+            analysis['resume_diff_html'] = generate_resume_diff_html(section_comparisons, left_filename, right_filename)
+            analysis['skills_html'] = generate_skills_comparison_html(compare_resume_skills(left_document, right_document))
+        return analysis
+    
+    key = content_hash(left_filename, left_text, right_filename, right_text)
+    return get_resume_analysis_cache().get_or_compute(key, analyze)
+
 # Function to toggle line selection for selective reconciliation
 def toggle_line_selection(line_num):
     if line_num in st.session_state.selected_lines:
@@ -178,6 +227,11 @@ st.sidebar.subheader("Upload Status")
 st.sidebar.info(f"Left files: {len(st.session_state.left_files)}")
 st.sidebar.info(f"Right files: {len(st.session_state.right_files)}")
 
+# Latency of every instrumented operation (file type detection, PDF extraction engines, ...)
+for operation, stats in latency_snapshot().items():
+    if stats['count']:
+        st.sidebar.caption(f"{operation}: {stats['count']} calls, {stats['mean_ms']:.2f} ms average, {stats['max_ms']:.2f} ms max")
+
 # Clear uploads button
 if st.sidebar.button("Clear All Uploads"):
     st.session_state.left_files = {}
@@ -188,8 +242,45 @@ if st.sidebar.button("Clear All Uploads"):
     st.session_state.selected_lines = []
     st.session_state.diff_lines = []
     st.session_state.is_resume_comparison = False
+    st.session_state.left_slides = {}
+    st.session_state.right_slides = {}
+    st.session_state.duplicate_clusters = None
     st.experimental_rerun()
 
+# Near-duplicate detection across an uploaded corpus
+def load_duplicate_pair(side, left_name, right_name):
+    source_files = st.session_state.left_files if side == "Left" else st.session_state.right_files
+    st.session_state.left_files.setdefault(left_name, source_files[left_name])
+    st.session_state.right_files.setdefault(right_name, source_files[right_name])
+    st.session_state.left_selected_file = left_name
+    st.session_state.right_selected_file = right_name
+    st.session_state.left_file_select = left_name
+    st.session_state.right_file_select = right_name
+
+if st.session_state.left_files or st.session_state.right_files:
+    with st.expander("Near-Duplicate Detection"):
+        duplicate_side = st.radio("Corpus to scan:", ["Left", "Right"], horizontal=True, key="duplicate_side")
+        duplicate_threshold = st.slider("Similarity threshold", min_value=0.3, max_value=1.0, value=0.7, step=0.05, key="duplicate_threshold")
+        
+        if st.button("Find Near-Duplicates"):
+            corpus = st.session_state.left_files if duplicate_side == "Left" else st.session_state.right_files
+            st.session_state.duplicate_clusters = find_near_duplicates(corpus, duplicate_threshold)
+            st.session_state.duplicate_side_scanned = duplicate_side
+        
+        clusters = st.session_state.get('duplicate_clusters')
+        if clusters is not None:
+            if not clusters:
+                st.info("No near-duplicates found.")
+            for cluster_num, cluster in enumerate(clusters, start=1):
+                st.markdown(f"**Cluster {cluster_num}:** {', '.join(cluster['documents'])}")
+                for pair_num, (left_name, right_name, similarity) in enumerate(cluster['pairs']):
+                    st.button(
+                        f"Diff {left_name} and {right_name} (~{int(similarity * 100)}% similar)",
+                        key=f"duplicate_pair_{cluster_num}_{pair_num}",
+                        on_click=load_duplicate_pair,
+                        args=(st.session_state.duplicate_side_scanned, left_name, right_name)
+                    )
+
 # Diff preview and editing
 st.markdown("---")
 st.subheader("Diff Preview and Editing")
@@ -199,17 +290,20 @@ if st.session_state.left_selected_file and st.session_state.right_selected_file:
     left_text = st.session_state.left_files[st.session_state.left_selected_file]
     right_text = st.session_state.right_files[st.session_state.right_selected_file]
     
-    # Check if both files are resumes
-    left_is_resume = is_resume(st.session_state.left_selected_file, left_text)
-    right_is_resume = is_resume(st.session_state.right_selected_file, right_text)
-    st.session_state.is_resume_comparison = left_is_resume and right_is_resume
+    # Check if both files are resumes (cached by content, so reruns don't re-parse them)
+    resume_analysis = analyze_resume_pair(st.session_state.left_selected_file, left_text, st.session_state.right_selected_file, right_text)
+    st.session_state.is_resume_comparison = resume_analysis['is_resume_comparison']
     
     # Display comparison type
     if st.session_state.is_resume_comparison:
         st.info("Resume comparison mode activated. Specialized resume comparison features are enabled.")
     
-    # Generate diff
-    st.session_state.diff_lines = get_diff_lines(left_text, right_text)
+    # Generate diff; files too large to diff and render here are refused before comparing
+    try:
+        st.session_state.diff_lines = get_diff_lines(left_text, right_text)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
     
     # Display diff statistics
     equal_lines = sum(1 for tag, _, _, _, _ in st.session_state.diff_lines if tag == 'equal')
@@ -269,22 +363,26 @@ if st.session_state.left_selected_file and st.session_state.right_selected_file:
     </script>
     """, unsafe_allow_html=True)
     
+    # Slide-aware comparison if both files are PowerPoint decks
+    left_slides = st.session_state.left_slides.get(st.session_state.left_selected_file)
+    right_slides = st.session_state.right_slides.get(st.session_state.right_selected_file)
+    if left_slides is not None and right_slides is not None:
+        st.markdown("---")
+        st.subheader("Slide Comparison")
+        show_unchanged = st.checkbox("Show unchanged slides", value=False)
+        
+        slide_comparisons = compare_slides(left_slides, right_slides)
+        slide_diff_html = generate_slide_diff_html(slide_comparisons, st.session_state.left_selected_file, st.session_state.right_selected_file, show_unchanged)
+        st.markdown('<div class="resume-diff">' + slide_diff_html + '</div>', unsafe_allow_html=True)
+    
     # Resume-specific comparison if both files are resumes
     if st.session_state.is_resume_comparison:
         st.markdown("---")
         st.subheader("Resume Comparison")
         
-        # Compare resume sections
-        section_comparisons = compare_resume_sections(left_text, right_text)
-        resume_diff_html = generate_resume_diff_html(section_comparisons, st.session_state.left_selected_file, st.session_state.right_selected_file)
-        
-        # Compare skills
-        skills_comparison = compare_resume_skills(left_text, right_text)
-        skills_html = generate_skills_comparison_html(skills_comparison)
-        
         # Display resume comparison
-        st.markdown('<div class="resume-diff">' + resume_diff_html + '</div>', unsafe_allow_html=True)
-        st.markdown('<div class="resume-diff">' + skills_html + '</div>', unsafe_allow_html=True)
+        st.markdown('<div class="resume-diff">' + resume_analysis['resume_diff_html'] + '</div>', unsafe_allow_html=True)
+        st.markdown('<div class="resume-diff">' + resume_analysis['skills_html'] + '</div>', unsafe_allow_html=True)
     
     # Reconciliation and output
     st.markdown("---")
@@ -300,9 +398,13 @@ if st.session_state.left_selected_file and st.session_state.right_selected_file:
         col1, col2 = st.columns(2)
         
         with col1:
-            # Download button
-            download_link = create_download_link(st.session_state.reconciled_text, output_filename, "Download Reconciled File")
-            st.markdown(download_link, unsafe_allow_html=True)
+            # Download button; Streamlit serves the file from its media endpoint only when clicked
+            st.download_button(
+                "Download Reconciled File",
+                st.session_state.reconciled_text.encode('utf-8'),
+                file_name=output_filename,
+                mime=get_download_mime_type(output_filename)
+            )
         
         with col2:
             # Save to project button
@@ -314,6 +416,27 @@ if st.session_state.left_selected_file and st.session_state.right_selected_file:
 else:
     st.info("Please upload and select files on both sides to view and edit differences.")
 
+# Compare files saved to the project folder; they are memory-mapped and read line by line
+saved_files = sorted(name for name in os.listdir(OUTPUT_DIR) if os.path.isfile(os.path.join(OUTPUT_DIR, name)))
+if saved_files:
+    st.markdown("---")
+    with st.expander("Compare Saved Files"):
+        saved_col1, saved_col2 = st.columns(2)
+        with saved_col1:
+            saved_left = st.selectbox("Left saved file:", saved_files, key="saved_left")
+        with saved_col2:
+            saved_right = st.selectbox("Right saved file:", saved_files, key="saved_right")
+        
+        if st.button("Compare Saved Files"):
+            try:
+                saved_diff = diff_files(os.path.join(OUTPUT_DIR, saved_left), os.path.join(OUTPUT_DIR, saved_right))
+            except (ValueError, OSError) as e:
+                st.error(str(e))
+            else:
+                saved_changes = sum(1 for tag, _, _, _, _ in saved_diff if tag != 'equal')
+                st.write(f"Found {saved_changes} differences out of {len(saved_diff)} total lines.")
+                st.markdown('<div class="diff-viewer">' + generate_diff_html(saved_diff, saved_left, saved_right) + '</div>', unsafe_allow_html=True)
+
 # Footer
 st.markdown("---")
 st.markdown("Diff Checker App - Built with Streamlit")
@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Default number of entries kept by an LRUCache
+DEFAULT_CACHE_SIZE = 64
+
+def content_hash(*parts):
+    """
+    Hash strings or bytes into a short hex digest for use as a cache key
+    Parts are length-prefixed, so ('ab', 'c') and ('a', 'bc') hash differently.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8', 'surrogatepass')
+        elif part is None:
+            part = b''
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+class LRUCache:
+    """
+    Thread-safe, bounded least-recently-used cache
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for a key, marking it as recently used
+        """
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries beyond maxsize
+        """
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for a key, calling compute() to fill it on a miss
+        compute runs outside the lock, so concurrent misses may compute the same value twice.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Remove every entry and reset the hit counters
+        """
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
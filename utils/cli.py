@@ -0,0 +1,239 @@
+import argparse
+import difflib
+import filecmp
+import json
+import os
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.encoding_utils import decode_text
+from utils.file_type_utils import SNIFF_BYTES, is_binary_content
+from utils.file_utils import OFFICE_EXTENSIONS, get_file_extension
+from utils.line_index import open_text_lines
+from utils.pool_utils import POOL_WORKERS
+
+# Exit codes, following diff(1)
+EXIT_SAME = 0
+EXIT_DIFFERENT = 1
+EXIT_ERROR = 2
+
+# Plain text files at least this large are read through memory-mapped line access rather
+# than loaded and decoded whole; difflib still holds the lines it compares
+MAPPED_LINES_THRESHOLD = 8 * 1024 * 1024
+
+# Default number of context lines in unified diffs
+CONTEXT_LINES = 3
+
+def list_source(path):
+    """
+    List the files of a comparison source: a file, a directory or a ZIP archive
+    Returns a dictionary of relative path -> locator, where a locator is
+    ('file', path) or ('zip', archive path, member name)
+    """
+    if os.path.isdir(path):
+        files = {}
+        for root, dirs, filenames in os.walk(path):
+            dirs.sort()
+            for filename in sorted(filenames):
+                full_path = os.path.join(root, filename)
+                files[os.path.relpath(full_path, path).replace(os.sep, '/')] = ('file', full_path)
+        return files
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return {info.filename: ('zip', path, info.filename) for info in archive.infolist() if not info.is_dir()}
+    return {os.path.basename(path): ('file', path)}
+
+def _read_bytes(locator):
+    if locator[0] == 'file':
+        with open(locator[1], 'rb') as f:
+            return f.read()
+    with zipfile.ZipFile(locator[1]) as archive:
+        return archive.read(locator[2])
+
+def _same_content(left, right):
+    if left[0] == 'file' and right[0] == 'file':
+        return filecmp.cmp(left[1], right[1], shallow=False)
+    return _read_bytes(left) == _read_bytes(right)
+
+def _locator_name(locator):
+    return os.path.basename(locator[1]) if locator[0] == 'file' else locator[2]
+
+def _load_lines(locator):
+    """
+    Load the lines of one side of a comparison, or None for unsupported binary files
+    Raises ExtractionError when an Office document or PDF can't be extracted.
+    """
+    name = _locator_name(locator)
+    extension = get_file_extension(name)
+    if locator[0] == 'file' and extension not in OFFICE_EXTENSIONS and os.path.getsize(locator[1]) >= MAPPED_LINES_THRESHOLD:
+        # Sniff the head so large images and archives aren't read as text
+        with open(locator[1], 'rb') as f:
+            if is_binary_content(f.read(SNIFF_BYTES), name):
+                return None
+        try:
+            return open_text_lines(locator[1])
+        except ValueError:
+            pass  # UTF-16/32 files are decoded in memory below
+
+    content = _read_bytes(locator)
+    if extension in OFFICE_EXTENSIONS:
+        # Imported here so plain-text comparisons don't pay for the Office document libraries.
+        # Comparisons already run in worker processes, so documents are extracted in
+        # process rather than through the isolated extraction pool.
+        from utils.document_utils import extract_document_in_process, is_extraction_error
+        from utils.extraction_pool import ExtractionError
+        text = extract_document_in_process(content, name)
+        # Failed extractions come back as an error message rather than raising
+        if is_extraction_error(text):
+            raise ExtractionError(text)
+        return text.splitlines()
+    if is_binary_content(content, name):
+        return None
+    return decode_text(content)[0].splitlines()
+
+def _close_lines(lines):
+    if hasattr(lines, 'close'):
+        lines.close()
+
+def compare_files(path, left, right, context_lines=CONTEXT_LINES, include_diff=True):
+    """
+    Compare one file present on either or both sides
+    left and right are locators from list_source, or None when the file is missing.
+    Returns a result dictionary with the 'path', a 'status' ('same', 'different',
+    'added', 'removed' or 'error'), added and removed line counts and, when
+    include_diff is set, the unified 'diff' text.
+    """
+    result = {'path': path, 'status': 'same', 'added_lines': 0, 'removed_lines': 0}
+    if left is None or right is None:
+        result['status'] = 'added' if left is None else 'removed'
+        return result
+
+    left_lines = right_lines = None
+    try:
+        if _same_content(left, right):
+            return result
+        result['status'] = 'different'
+
+        left_lines = _load_lines(left)
+        right_lines = _load_lines(right)
+        if left_lines is None or right_lines is None:
+            result['binary'] = True
+            return result
+
+        diff = []
+        for line in difflib.unified_diff(left_lines, right_lines, f"a/{path}", f"b/{path}", n=context_lines, lineterm=''):
+            if line.startswith('+') and not line.startswith('+++'):
+                result['added_lines'] += 1
+            elif line.startswith('-') and not line.startswith('---'):
+                result['removed_lines'] += 1
+            if include_diff:
+                diff.append(line)
+        if include_diff:
+            result['diff'] = '\n'.join(diff)
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    finally:
+        _close_lines(left_lines)
+        _close_lines(right_lines)
+    return result
+
+def _is_plain_file(path):
+    return not os.path.isdir(path) and not zipfile.is_zipfile(path)
+
+def _compare_task(task):
+    return compare_files(*task)
+
+def compare_paths(left_path, right_path, workers=None, context_lines=CONTEXT_LINES, include_diff=True):
+    """
+    Compare two files, directories or ZIP archives
+    Files are paired by relative path (two plain files are always paired with each other)
+    and compared across a pool of worker processes. Yields result dictionaries from
+    compare_files in path order.
+    """
+    left_files = list_source(left_path)
+    right_files = list_source(right_path)
+    if _is_plain_file(left_path) and _is_plain_file(right_path):
+        # Two plain files are compared with each other whatever their names
+        left_files = {name: left_files[next(iter(left_files))] for name in right_files}
+
+    paths = sorted(set(left_files) | set(right_files))
+    tasks = [(path, left_files.get(path), right_files.get(path), context_lines, include_diff) for path in paths]
+
+    workers = workers or POOL_WORKERS
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _compare_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_compare_task, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+
+def summarize(results):
+    """
+    Count comparison results by status
+    """
+    summary = {'files': 0, 'same': 0, 'different': 0, 'added': 0, 'removed': 0, 'error': 0}
+    for result in results:
+        summary['files'] += 1
+        summary[result['status']] += 1
+    return summary
+
+def exit_code(summary):
+    """
+    CI exit code for a summary: 0 if everything matches, 1 on differences, 2 on errors
+    """
+    if summary['error']:
+        return EXIT_ERROR
+    if summary['different'] or summary['added'] or summary['removed']:
+        return EXIT_DIFFERENT
+    return EXIT_SAME
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m utils.cli', description="Compare files, directories or ZIP archives")
+    parser.add_argument('left', help="left file, directory or ZIP archive")
+    parser.add_argument('right', help="right file, directory or ZIP archive")
+    parser.add_argument('-f', '--format', choices=['diff', 'json', 'jsonl'], default='diff',
+                        help="unified diffs (default), one JSON document, or one JSON object per file")
+    parser.add_argument('-U', '--unified', type=int, default=CONTEXT_LINES, help="lines of context in unified diffs")
+    parser.add_argument('-j', '--workers', type=int, default=POOL_WORKERS, help="worker processes")
+    parser.add_argument('--no-diff', action='store_true', help="leave unified diffs out of JSON output")
+    parser.add_argument('-q', '--quiet', action='store_true', help="don't print the summary to stderr")
+    args = parser.parse_args(argv)
+
+    for path in (args.left, args.right):
+        if not os.path.exists(path):
+            print(f"Error: {path} does not exist", file=sys.stderr)
+            return EXIT_ERROR
+
+    include_diff = args.format == 'diff' or not args.no_diff
+    results = []
+    for result in compare_paths(args.left, args.right, args.workers, args.unified, include_diff):
+        results.append(result)
+        if args.format == 'jsonl':
+            print(json.dumps(result), flush=True)
+        elif args.format == 'diff':
+            if result['status'] == 'error':
+                print(f"Error comparing {result['path']}: {result['error']}", file=sys.stderr)
+            elif result['status'] in ('added', 'removed'):
+                print(f"Only in {'right' if result['status'] == 'added' else 'left'}: {result['path']}")
+            elif result.get('binary'):
+                print(f"Binary files a/{result['path']} and b/{result['path']} differ")
+            elif result.get('diff'):
+                print(result['diff'])
+            # Drop diff text once printed; only the counts are kept for the summary
+            result.pop('diff', None)
+
+    summary = summarize(results)
+    if args.format == 'json':
+        print(json.dumps({'summary': summary, 'files': results}, indent=2))
+    elif args.format == 'jsonl':
+        print(json.dumps({'summary': summary}))
+    if not args.quiet:
+        print(f"{summary['files']} files compared: {summary['same']} same, {summary['different']} different, "
+              f"{summary['added']} added, {summary['removed']} removed, {summary['error']} errors", file=sys.stderr)
+    return exit_code(summary)
+
+if __name__ == '__main__':
+    sys.exit(main())
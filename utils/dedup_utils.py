@@ -0,0 +1,140 @@
+import zlib
+
+import numpy as np
+
+from utils.keyword_matcher import tokenize
+
+# Estimated Jaccard similarity at or above which two documents count as near-duplicates
+DUPLICATE_THRESHOLD = 0.7
+
+# Number of MinHash permutations per signature
+NUM_PERMUTATIONS = 128
+
+# Number of consecutive words per shingle
+SHINGLE_SIZE = 5
+
+# Largest prime below 2**61, used for the universal hash family
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+# Maximum shingles hashed at once, to bound the size of the permutation matrix
+SIGNATURE_CHUNK_SIZE = 4096
+
+def shingle_document(text, shingle_size=SHINGLE_SIZE):
+    """
+    Hash the word shingles of a text into a unique array of 32-bit values
+    Token hashes are combined into shingle hashes with a vectorized polynomial hash.
+    """
+    tokens = [token for token in tokenize(text) if token[0].isalnum()]
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+
+    # crc32 rather than hash(), which is salted per process
+    token_table = {token: zlib.crc32(token.encode('utf-8')) for token in set(tokens)}
+    token_hashes = np.fromiter((token_table[token] for token in tokens), dtype=np.uint64, count=len(tokens))
+
+    width = min(shingle_size, len(token_hashes))
+    count = len(token_hashes) - width + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(width):
+            shingles = shingles * np.uint64(1000003) + token_hashes[offset:offset + count]
+    return np.unique(shingles & np.uint64(0xFFFFFFFF))
+
+def make_permutations(num_permutations=NUM_PERMUTATIONS, seed=1):
+    """
+    Draw the (a, b) coefficients of the MinHash hash family
+    """
+    generator = np.random.RandomState(seed)
+    a = generator.randint(1, 1 << 32, size=num_permutations, dtype=np.uint64)
+    b = generator.randint(0, 1 << 32, size=num_permutations, dtype=np.uint64)
+    return a, b
+
+def minhash_signature(shingles, permutations):
+    """
+    Compute the MinHash signature of a shingle array with vectorized universal hashing
+    """
+    a, b = permutations
+    signature = np.full(len(a), MERSENNE_PRIME, dtype=np.uint64)
+    for start in range(0, len(shingles), SIGNATURE_CHUNK_SIZE):
+        chunk = shingles[start:start + SIGNATURE_CHUNK_SIZE]
+        hashed = (np.outer(a, chunk) + b[:, None]) % MERSENNE_PRIME
+        np.minimum(signature, hashed.min(axis=1), out=signature)
+    return signature
+
+def choose_bands(num_permutations, threshold):
+    """
+    Pick the LSH band count whose S-curve threshold (1/b)^(1/r) is closest to the target
+    """
+    best = None
+    for bands in range(1, num_permutations + 1):
+        if num_permutations % bands:
+            continue
+        rows = num_permutations // bands
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands)
+    return best[1]
+
+def _find(parents, item):
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+def find_near_duplicates(documents, threshold=DUPLICATE_THRESHOLD, num_permutations=NUM_PERMUTATIONS, shingle_size=SHINGLE_SIZE):
+    """
+    Find clusters of near-duplicate documents in a corpus with MinHash LSH
+    documents: dictionary of name -> text
+    Returns a list of clusters, largest first, each a dictionary with the member
+    'documents' and the candidate 'pairs' (left, right, estimated Jaccard similarity).
+    Only the pairs listed here need a full diff.
+    """
+    names = list(documents)
+    permutations = make_permutations(num_permutations)
+
+    signatures = np.empty((len(names), num_permutations), dtype=np.uint64)
+    empty = set()
+    for i, name in enumerate(names):
+        shingles = shingle_document(documents[name], shingle_size)
+        if not len(shingles):
+            empty.add(i)
+        signatures[i] = minhash_signature(shingles, permutations)
+
+    # Bucket every band of every signature; documents sharing any bucket are candidates
+    bands = choose_bands(num_permutations, threshold)
+    rows = num_permutations // bands
+    candidates = set()
+    for band in range(bands):
+        buckets = {}
+        band_slice = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i in range(len(names)):
+            if i not in empty:
+                buckets.setdefault(band_slice[i].tobytes(), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+
+    # Keep candidates whose estimated similarity clears the threshold, then cluster them
+    parents = list(range(len(names)))
+    pairs = []
+    for i, j in sorted(candidates):
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity >= threshold:
+            pairs.append((i, j, similarity))
+            parents[_find(parents, i)] = _find(parents, j)
+
+    clusters = {}
+    for i, j, similarity in pairs:
+        cluster = clusters.setdefault(_find(parents, i), {'documents': set(), 'pairs': []})
+        cluster['documents'].update((i, j))
+        cluster['pairs'].append((names[i], names[j], similarity))
+
+    result = []
+    for cluster in clusters.values():
+        result.append({
+            'documents': [names[i] for i in sorted(cluster['documents'])],
+            'pairs': sorted(cluster['pairs'], key=lambda pair: -pair[2])
+        })
+    result.sort(key=lambda cluster: (-len(cluster['documents']), cluster['documents']))
+    return result
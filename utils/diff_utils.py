@@ -5,14 +5,26 @@ from pygments.formatters import HtmlFormatter
 import re
 import html
 
-def get_diff_lines(left_text, right_text):
+from utils.encoding_utils import decode_text
+from utils.line_index import open_text_lines
+
+# Most lines (both sides together) diffed and rendered in one comparison
+MAX_DIFF_LINES = 200000
+
+def get_diff_lines(left_text, right_text, max_lines=MAX_DIFF_LINES):
     """
     Generate line-by-line diff between two text files.
+    Either side may also be a sequence of lines, such as utils.line_index.MappedLines,
+    whose length is known without reading the file. Raises ValueError when the two sides
+    have more than max_lines lines together, before any line is compared.
     Returns a list of tuples (tag, left_line, right_line, left_line_num, right_line_num)
     where tag is one of 'equal', 'replace', 'delete', 'insert'
     """
-    left_lines = left_text.splitlines()
-    right_lines = right_text.splitlines()
+    left_lines = left_text.splitlines() if isinstance(left_text, str) else left_text
+    right_lines = right_text.splitlines() if isinstance(right_text, str) else right_text
+    total_lines = len(left_lines) + len(right_lines)
+    if max_lines is not None and total_lines > max_lines:
+        raise ValueError(f"The files have {total_lines} lines together; at most {max_lines} can be diffed here")
     
     # Generate diff using difflib
     differ = difflib.Differ()
@@ -42,6 +54,35 @@ def get_diff_lines(left_text, right_text):
     
     return result
 
+def _open_lines(path):
+    """
+    Open an on-disk text file for lazy line access, decoding it in memory when its
+    encoding can't be memory-mapped (UTF-16/32)
+    """
+    try:
+        return open_text_lines(path)
+    except ValueError:
+        with open(path, 'rb') as f:
+            return decode_text(f.read())[0].splitlines()
+
+def diff_files(left_path, right_path, max_lines=MAX_DIFF_LINES):
+    """
+    Generate a line-by-line diff of two on-disk text files, as get_diff_lines
+    Files are memory-mapped and read line by line; the line-count guard is checked from
+    the line index before any line is decoded.
+    """
+    left_lines = _open_lines(left_path)
+    try:
+        right_lines = _open_lines(right_path)
+        try:
+            return get_diff_lines(left_lines, right_lines, max_lines)
+        finally:
+            if hasattr(right_lines, 'close'):
+                right_lines.close()
+    finally:
+        if hasattr(left_lines, 'close'):
+            left_lines.close()
+
 def highlight_code(code, filename):
     """
     Apply syntax highlighting to code based on file extension.
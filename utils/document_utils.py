@@ -1,5 +1,6 @@
 import os
 import io
+import re
 import docx2txt
 import PyPDF2
 from docx import Document
@@ -7,7 +8,28 @@ from pptx import Presentation
 import zipfile
 import tempfile
 import mimetypes
-import magic  # For better file type detection
+from utils.encoding_utils import decode_text
+from utils.file_type_utils import is_binary_content
+from utils.file_utils import OFFICE_EXTENSIONS
+from utils.pdf_utils import extract_pdf_text
+from utils.resume_utils import ResumeDocument
+from utils.extraction_pool import ExtractionError, run_isolated_extraction
+from concurrent.futures import ThreadPoolExecutor
+
+# Decks with at least this many slides are extracted across a thread pool
+PARALLEL_SLIDE_THRESHOLD = 50
+
+# Start of the message extractors return in place of text when extraction fails
+EXTRACTION_ERROR_PREFIX = "Error extracting text"
+
+# Document extensions extracted in isolated worker processes, mapped to extractor kinds
+ISOLATED_EXTRACTION_KINDS = {
+    '.docx': 'docx',
+    '.doc': 'docx',
+    '.pdf': 'pdf',
+    '.pptx': 'pptx',
+    '.ppt': 'pptx'
+}
 
 def extract_text_from_docx(file_content):
     """
@@ -41,52 +63,105 @@ def extract_text_from_pdf(file_content):
     except Exception as e:
         return f"Error extracting text from PDF: {str(e)}"
 
+def _extract_slide_text(slide):
+    """
+    Extract the text of a single slide, one shape per line
+    """
+    return '\n'.join(shape.text for shape in slide.shapes if hasattr(shape, "text"))
+
+def extract_slides_from_pptx(file_content, max_workers=None, parallel_threshold=PARALLEL_SLIDE_THRESHOLD):
+    """
+    Extract text from a PowerPoint file slide by slide
+    Returns a list of dictionaries with 'slide_id', 'index' and 'text' keys, in deck order.
+    Large decks are extracted across a thread pool.
+    """
+    prs = Presentation(io.BytesIO(file_content))
+    slides = list(prs.slides)
+
+    if len(slides) >= parallel_threshold:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            texts = list(executor.map(_extract_slide_text, slides))
+    else:
+        texts = [_extract_slide_text(slide) for slide in slides]
+
+    return [
+        {'slide_id': slide.slide_id, 'index': index, 'text': text}
+        for index, (slide, text) in enumerate(zip(slides, texts))
+    ]
+
+def slides_to_text(slides):
+    """
+    Flatten slides returned by extract_slides_from_pptx into plain text
+    """
+    return ''.join(slide['text'] + "\n" for slide in slides if slide['text'])
+
 def extract_text_from_pptx(file_content):
     """
     Extract text from a PowerPoint file
     """
     try:
-        prs = Presentation(io.BytesIO(file_content))
-        text = ""
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + "\n"
-        return text
+        return slides_to_text(extract_slides_from_pptx(file_content))
     except Exception as e:
         return f"Error extracting text from PowerPoint: {str(e)}"
 
+def is_extraction_error(text):
+    """
+    Check whether extracted text is the error message of a failed extraction
+    Extractors report failures as a message starting with EXTRACTION_ERROR_PREFIX rather than raising.
+    """
+    return isinstance(text, str) and text.startswith(EXTRACTION_ERROR_PREFIX)
+
 def is_binary_file(file_content, filename):
     """
     Check if a file is binary (non-text) based on content and extension
     """
-    # First check by extension
-    text_extensions = [
-        '.txt', '.py', '.js', '.html', '.css', '.md', '.json', '.xml', 
-        '.csv', '.c', '.cpp', '.h', '.java', '.php', '.rb', '.go', 
-        '.rs', '.ts', '.sh', '.bat', '.ps1', '.yaml', '.yml', 
-        '.toml', '.ini', '.cfg', '.docx', '.doc', '.pdf', '.pptx', '.ppt'
-    ]
-    
+    return is_binary_content(file_content, filename)
+
+def extract_text_isolated(file_content, filename):
+    """
+    Extract text from an Office or PDF document in an isolated worker process
+    Timeouts and worker failures are reported as an error string instead of raising.
+    """
     ext = os.path.splitext(filename)[1].lower()
-    if ext not in text_extensions:
-        # Try to detect file type using python-magic
-        try:
-            mime = magic.Magic(mime=True)
-            file_type = mime.from_buffer(file_content)
-            
-            # Check if it's a text type
-            if not file_type.startswith('text/') and not any(x in file_type for x in ['word', 'pdf', 'powerpoint', 'excel', 'opendocument']):
-                return True  # It's binary
-        except:
-            # If magic fails, use a simple heuristic
-            try:
-                content_sample = file_content[:1024]  # Check first 1KB
-                return b'\0' in content_sample  # If it contains null bytes, it's likely binary
-            except:
-                return True  # Assume binary if we can't determine
-    
-    return False  # Assume it's a text file if we get here
+    try:
+        return run_isolated_extraction(ISOLATED_EXTRACTION_KINDS[ext], file_content)
+    except ExtractionError as e:
+        return f"Error extracting text from {filename}: {str(e)}"
+
+def _extract_pdf_isolated(file_content, first_page=None, last_page=None):
+    return run_isolated_extraction('pdf', file_content)
+
+def extract_pdf_document(file_content, filename):
+    """
+    Extract text from a PDF with pdftotext, falling back to PyPDF2 in an isolated worker
+    Latency is recorded per engine; failures are reported as an error string instead of raising.
+    """
+    try:
+        return extract_pdf_text(file_content, fallback=_extract_pdf_isolated)[0]
+    except ExtractionError as e:
+        return f"Error extracting text from {filename}: {str(e)}"
+
+# In-process extractors for Office documents, by extension
+IN_PROCESS_EXTRACTORS = {
+    '.docx': extract_text_from_docx,
+    '.doc': extract_text_from_docx,
+    '.pptx': extract_text_from_pptx,
+    '.ppt': extract_text_from_pptx
+}
+
+def extract_document_in_process(file_content, filename):
+    """
+    Extract text from an Office document or PDF in the current process
+    For callers that already run in a worker process of their own, where starting the
+    isolated extraction pool would nest process pools. Failures are reported as an error string.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext != '.pdf':
+        return IN_PROCESS_EXTRACTORS[ext](file_content)
+    try:
+        return extract_pdf_text(file_content)[0]
+    except Exception as e:
+        return f"Error extracting text from {filename}: {str(e)}"
 
 def extract_text_from_file(file_content, filename):
     """
@@ -95,28 +170,24 @@ def extract_text_from_file(file_content, filename):
     ext = os.path.splitext(filename)[1].lower()
     
     # Check if it's a binary file we don't support
-    if is_binary_file(file_content, filename) and ext not in ['.docx', '.pdf', '.pptx', '.doc', '.ppt']:
+    if is_binary_file(file_content, filename) and ext not in OFFICE_EXTENSIONS:
         return None  # Skip binary files we don't support
     
     # Handle different file types
-    if ext == '.docx' or ext == '.doc':
-        return extract_text_from_docx(file_content)
-    elif ext == '.pdf':
-        return extract_text_from_pdf(file_content)
-    elif ext == '.pptx' or ext == '.ppt':
-        return extract_text_from_pptx(file_content)
+    if ext == '.pdf':
+        return extract_pdf_document(file_content, filename)
+    elif ext in ISOLATED_EXTRACTION_KINDS:
+        return extract_text_isolated(file_content, filename)
     elif ext == '.zip':
         # For zip files, we'll extract and process them separately
         return None
     else:
-        # For text files, try to decode
+        # For text files, detect the encoding from a bounded sample and decode in one pass
         try:
-            return file_content.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                return file_content.decode('latin-1')  # Try another encoding
-            except:
-                return None  # Skip if we can't decode
+            text, _ = decode_text(file_content)
+            return text
+        except (UnicodeDecodeError, LookupError):
+            return None  # Skip if we can't decode
 
 def process_zip_file(zip_content, target_dict, max_depth=3, current_depth=0):
     """
@@ -156,28 +227,54 @@ def process_zip_file(zip_content, target_dict, max_depth=3, current_depth=0):
     os.unlink(temp_zip_path)
     return target_dict
 
-def is_resume(filename, content):
+# Filename terms that mark a resume outright
+RESUME_FILENAME_RE = re.compile(r'resume|cv|curriculum|vitae', re.IGNORECASE)
+
+# Section terms counted in the content, all in one precompiled alternation.
+# It is matched case-sensitively against a lowercased prefix, which is much faster than IGNORECASE.
+RESUME_SECTION_TERMS = [
+    'experience', 'education', 'skills', 'objective',
+    'summary', 'employment', 'work history', 'qualification',
+    'certification', 'reference', 'project'
+]
+RESUME_SECTION_RE = re.compile('|'.join(re.escape(term) for term in RESUME_SECTION_TERMS))
+
+# Resumes put their headings early, so only this many leading characters are scanned
+RESUME_SCAN_CHARS = 16384
+
+# Distinct section terms at which content scores full confidence
+RESUME_FULL_CONFIDENCE_TERMS = 5
+
+# Confidence at or above which a document is treated as a resume (three section terms)
+RESUME_CONFIDENCE_THRESHOLD = 0.6
+
+def resume_confidence(filename, content, scan_chars=RESUME_SCAN_CHARS):
     """
-    Attempt to detect if a file is likely a resume
+    Score how likely a file is to be a resume, between 0 and 1
+    A resume-like filename scores 1. Otherwise the score grows with the number of
+    distinct section terms in the first scan_chars characters of the content, found in
+    a single pass. content may be text or a ResumeDocument.
     """
-    # Check filename for resume-related terms
-    resume_terms = ['resume', 'cv', 'curriculum', 'vitae']
-    if any(term in filename.lower() for term in resume_terms):
-        return True
-    
-    # Check content for resume-related sections
-    resume_sections = [
-        'experience', 'education', 'skills', 'objective', 
-        'summary', 'employment', 'work history', 'qualification',
-        'certification', 'reference', 'project'
-    ]
+    if filename and RESUME_FILENAME_RE.search(filename):
+        return 1.0
     
-    # For text content
-    if isinstance(content, str):
-        if any(section.lower() in content.lower() for section in resume_sections):
-            # Count how many resume sections are present
-            section_count = sum(1 for section in resume_sections if section.lower() in content.lower())
-            # If multiple resume sections are present, it's likely a resume
-            return section_count >= 3
+    if isinstance(content, ResumeDocument):
+        prefix = content.lower_text[:scan_chars]
+    elif isinstance(content, str):
+        prefix = content[:scan_chars].lower()
+    else:
+        return 0.0
     
-    return False
+    found = set()
+    for match in RESUME_SECTION_RE.finditer(prefix):
+        found.add(match.group())
+        if len(found) >= RESUME_FULL_CONFIDENCE_TERMS:
+            break
+    return len(found) / RESUME_FULL_CONFIDENCE_TERMS
+
+def is_resume(filename, content):
+    """
+    Attempt to detect if a file is likely a resume
+    content may be text or a ResumeDocument
+    """
+    return resume_confidence(filename, content) >= RESUME_CONFIDENCE_THRESHOLD
@@ -0,0 +1,102 @@
+import codecs
+
+# Bytes of the payload inspected when guessing the encoding
+SAMPLE_SIZE = 64 * 1024
+
+# Size of the memoryview slices fed to the incremental decoder
+DECODE_CHUNK_SIZE = 1024 * 1024
+
+# Byte order marks, longest first so UTF-32 LE wins over UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes that are printable in cp1252 but control characters in latin-1
+CP1252_ONLY_BYTES = frozenset(range(0x80, 0xa0))
+
+# Codec error handler that decodes invalid bytes as latin-1, which accepts any byte
+LATIN1_FALLBACK = 'latin-1-fallback'
+
+def _latin1_fallback(error):
+    return bytes(error.object[error.start:error.end]).decode('latin-1'), error.end
+
+codecs.register_error(LATIN1_FALLBACK, _latin1_fallback)
+
+def _sample_decodes(sample, encoding, final):
+    """
+    Check whether a sample decodes cleanly, allowing a truncated character at the end
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        decoder.decode(sample, final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def _guess_utf16_without_bom(sample):
+    """
+    Guess UTF-16 byte order from the distribution of null bytes in a sample
+    Returns None if the sample doesn't look like UTF-16
+    """
+    pairs = len(sample) // 2
+    if pairs < 2:
+        return None
+
+    even_nulls = sample[0:pairs * 2:2].count(0)
+    odd_nulls = sample[1:pairs * 2:2].count(0)
+    if odd_nulls > pairs * 0.3 and even_nulls < pairs * 0.05:
+        return 'utf-16-le'
+    if even_nulls > pairs * 0.3 and odd_nulls < pairs * 0.05:
+        return 'utf-16-be'
+    return None
+
+def detect_encoding(file_content, sample_size=SAMPLE_SIZE):
+    """
+    Detect the text encoding of a byte payload
+    Checks for a BOM, then samples a bounded prefix; never scans the whole payload.
+    Returns a codec name suitable for codecs.getincrementaldecoder.
+    """
+    view = memoryview(file_content)
+    head = bytes(view[:4])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    sample = bytes(view[:sample_size])
+    is_complete = len(view) <= sample_size
+
+    utf16 = _guess_utf16_without_bom(sample)
+    if utf16 and _sample_decodes(sample, utf16, is_complete):
+        return utf16
+
+    if _sample_decodes(sample, 'utf-8', is_complete):
+        return 'utf-8'
+
+    if CP1252_ONLY_BYTES.intersection(sample) and _sample_decodes(sample, 'cp1252', is_complete):
+        return 'cp1252'
+
+    return 'latin-1'
+
+def iter_decode(file_content, encoding, chunk_size=DECODE_CHUNK_SIZE, errors='strict'):
+    """
+    Incrementally decode a byte payload, yielding text chunks
+    The payload is sliced through a memoryview so no intermediate byte copies are made.
+    """
+    view = memoryview(file_content)
+    chunks = (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+    return codecs.iterdecode(chunks, encoding, errors)
+
+def decode_text(file_content, encoding=None):
+    """
+    Decode a byte payload to text in a single pass
+    Returns a tuple of (text, encoding). Bytes beyond the sampled prefix that are invalid
+    in the detected encoding are decoded as latin-1 where they occur, so no byte is
+    decoded twice.
+    """
+    if encoding is None:
+        encoding = detect_encoding(file_content)
+    return ''.join(iter_decode(file_content, encoding, errors=LATIN1_FALLBACK)), encoding
@@ -0,0 +1,244 @@
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import Future, as_completed
+from io import BytesIO
+
+import docx
+import markdown
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt
+
+from utils.cache_utils import LRUCache, content_hash
+from utils.pool_utils import get_process_pool
+
+# Rendered documents kept in memory, keyed by content hash, format and file type
+EXPORT_CACHE_SIZE = 64
+
+# Stylesheet shared by every PDF render; parsed once per worker process
+PDF_STYLESHEET = """
+body { font-family: Arial, sans-serif; margin: 40px; }
+h1 { text-align: center; font-size: 18pt; }
+h2 { font-size: 16pt; margin-top: 20px; }
+h3 { font-size: 14pt; }
+p { font-size: 12pt; line-height: 1.5; }
+ul { padding-left: 20px; }
+li { margin-bottom: 5px; }
+.center { text-align: center; }
+"""
+
+PDF_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+_stylesheet = None
+
+def _get_stylesheet():
+    """
+    Parse the PDF stylesheet on first use in this process
+    """
+    global _stylesheet
+    if _stylesheet is None:
+        from weasyprint import CSS
+        _stylesheet = CSS(string=PDF_STYLESHEET)
+    return _stylesheet
+
+def _render_pdf(text, body_html=None):
+    """
+    Render markdown text to PDF bytes; runs in a pool worker
+    body_html, when given, is the text already converted to HTML and is used as-is.
+    """
+    from weasyprint import HTML
+    if body_html is None:
+        body_html = markdown.markdown(text)
+    html = PDF_HTML_TEMPLATE.format(body=body_html)
+    return HTML(string=html).write_pdf(stylesheets=[_get_stylesheet()])
+
+# Paragraph styles predefined in the DOCX base template: (name, font size, bold, centered)
+DOCX_STYLES = [
+    ('Resume Title', 16, True, True),
+    ('Resume Section', 14, True, False),
+    ('Resume Subsection', 12, True, False)
+]
+
+_base_template = None
+
+def _get_base_template():
+    """
+    Build the DOCX base template with its predefined styles on first use in this process
+    Returns the template as bytes, so each document starts from an in-memory copy.
+    """
+    global _base_template
+    if _base_template is None:
+        document = docx.Document()
+        for name, size, bold, centered in DOCX_STYLES:
+            style = document.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = document.styles['Normal']
+            style.font.size = Pt(size)
+            style.font.bold = bold
+            if centered:
+                style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        template_io = BytesIO()
+        document.save(template_io)
+        _base_template = template_io.getvalue()
+    return _base_template
+
+def _render_docx(text, title):
+    """
+    Render markdown-style text to DOCX bytes from the base template; runs in a pool worker
+    """
+    document = docx.Document(BytesIO(_get_base_template()))
+    document.add_paragraph(title, style='Resume Title')
+
+    for para in text.split('\n'):
+        if para.strip():
+            if para.startswith('## '):
+                document.add_paragraph(para[3:], style='Resume Section')
+            elif para.startswith('### '):
+                document.add_paragraph(para[4:], style='Resume Subsection')
+            elif para.startswith('- '):
+                document.add_paragraph(para[2:], style='List Bullet')
+            else:
+                document.add_paragraph(para)
+
+    docx_io = BytesIO()
+    document.save(docx_io)
+    return docx_io.getvalue()
+
+class RenderService:
+    """
+    Renders documents in the background and caches the results by content
+    Renders run in the shared process pool, so the calling thread (and the Streamlit
+    session) only waits when it needs the bytes. Identical requests that are already
+    rendering share one render.
+    """
+
+    def __init__(self, cache_size=EXPORT_CACHE_SIZE):
+        self._cache = LRUCache(cache_size)
+        self._pending = {}
+        # Reentrant: a render that is already done runs its callback inside submit
+        self._lock = threading.RLock()
+
+    def submit(self, file_type, format_type, text, render, *args, key_args=None):
+        """
+        Start rendering a document unless it is cached or already rendering
+        render(text, *args) must be a picklable module-level function returning bytes.
+        Renders are keyed by file type, format, text and key_args, which defaults to args;
+        pass the arguments that change the output when some of args are derived from text.
+        Returns a Future for the rendered bytes.
+        """
+        key_args = args if key_args is None else key_args
+        key = content_hash(file_type, format_type, text, *(str(arg) for arg in key_args))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                future = get_process_pool().submit(render, text, *args)
+                self._pending[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+            return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self._cache.put(key, future.result())
+
+    def submit_pdf(self, text, format_type, body_html=None):
+        """
+        Start rendering markdown text to PDF in the background
+        body_html is the text's precompiled HTML, such as TemplateRegistry.get_html, if known.
+        """
+        # body_html is derived from text, so it stays out of the cache key
+        if body_html is None:
+            return self.submit('pdf', format_type, text, _render_pdf)
+        return self.submit('pdf', format_type, text, _render_pdf, body_html, key_args=())
+
+    def render_pdf(self, text, format_type, body_html=None, timeout=None):
+        """
+        Render markdown text to PDF bytes, served from the cache for repeat requests
+        """
+        return self.submit_pdf(text, format_type, body_html).result(timeout)
+
+    def submit_docx(self, text, format_type, title):
+        """
+        Start rendering markdown-style text to DOCX in the background
+        """
+        return self.submit('docx', format_type, text, _render_docx, title)
+
+    def render_docx(self, text, format_type, title, timeout=None):
+        """
+        Render markdown-style text to DOCX bytes, served from the cache for repeat requests
+        """
+        return self.submit_docx(text, format_type, title).result(timeout)
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_render_service():
+    """
+    Get the process-wide RenderService, creating it on first use
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RenderService()
+        return _service
+
+# File types included in an export bundle, in the order they are started
+EXPORT_FILE_TYPES = ('md', 'docx', 'pdf')
+
+def write_export_bundle(documents, target, title, file_types=EXPORT_FILE_TYPES, html_documents=None):
+    """
+    Render every document in every file type concurrently into a ZIP written to target
+    documents: dictionary of format type -> markdown text
+    html_documents: optional dictionary of format type -> precompiled HTML of that text
+    Renders are all started up front; each file is added to the ZIP as soon as its
+    render finishes, so the total time is close to that of the slowest render.
+    Returns a list of (filename, error message) for renders that failed.
+    """
+    service = get_render_service()
+    html_documents = html_documents or {}
+    futures = {}
+    errors = []
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for format_type, text in documents.items():
+            for file_type in file_types:
+                filename = f"{format_type}_resume.{file_type}"
+                if file_type == 'md':
+                    bundle.writestr(filename, text)
+                elif file_type == 'docx':
+                    futures[service.submit_docx(text, format_type, title)] = filename
+                elif file_type == 'pdf':
+                    futures[service.submit_pdf(text, format_type, html_documents.get(format_type))] = filename
+
+        for future in as_completed(futures):
+            try:
+                bundle.writestr(futures[future], future.result())
+            except Exception as e:
+                errors.append((futures[future], str(e)))
+    return errors
+
+def create_export_bundle(documents, title, file_types=EXPORT_FILE_TYPES, html_documents=None):
+    """
+    Render every document in every file type into a temporary ZIP file on disk
+    Each rendered file is written to the ZIP as soon as its render finishes, so only the
+    renders in flight are held in memory, never the whole bundle. The caller owns the
+    file and should delete it when done.
+    Returns (zip file path, list of (filename, error message) for failed renders)
+    """
+    with tempfile.NamedTemporaryFile(prefix='resume_export_', suffix='.zip', delete=False) as bundle_file:
+        errors = write_export_bundle(documents, bundle_file, title, file_types, html_documents)
+    return bundle_file.name, errors
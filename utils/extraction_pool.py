@@ -0,0 +1,147 @@
+import multiprocessing
+import queue
+import threading
+
+# Wall-clock seconds a single extraction may take before its worker is killed
+EXTRACTION_TIMEOUT = 60
+
+# Address space limit for each worker process, in bytes
+EXTRACTION_MEMORY_LIMIT = 1024 * 1024 * 1024
+
+# Number of worker processes in the shared pool
+EXTRACTION_WORKERS = 2
+
+class ExtractionError(Exception):
+    """
+    Raised when an isolated extraction fails or its worker dies
+    """
+
+class ExtractionTimeoutError(ExtractionError):
+    """
+    Raised when an isolated extraction exceeds its wall-clock timeout
+    """
+
+def _get_extractors():
+    from utils import document_utils
+    return {
+        'docx': document_utils.extract_text_from_docx,
+        'pdf': document_utils.extract_text_from_pdf,
+        'pptx': document_utils.extract_text_from_pptx,
+        'pptx_slides': document_utils.extract_slides_from_pptx,
+    }
+
+def _limit_memory(memory_limit):
+    """
+    Cap the address space of the current process, where the platform allows it
+    """
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def _worker_main(conn, memory_limit):
+    """
+    Worker process loop: receive (kind, content) jobs and send back (ok, result) tuples
+    """
+    if memory_limit:
+        _limit_memory(memory_limit)
+    extractors = _get_extractors()
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        kind, content = job
+        try:
+            conn.send((True, extractors[kind](content)))
+        except MemoryError:
+            conn.send((False, "ran out of memory"))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+class _Worker:
+    def __init__(self, context, memory_limit):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+class ExtractionPool:
+    """
+    Pool of isolated worker processes for document text extraction
+    Each job runs with a wall-clock timeout; workers that time out or die
+    (for example on hitting the memory limit) are killed and replaced.
+    """
+
+    def __init__(self, workers=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT, memory_limit=EXTRACTION_MEMORY_LIMIT):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_Worker(self._context, memory_limit))
+
+    def extract(self, kind, content, timeout=None):
+        """
+        Run one extraction ('docx', 'pdf', 'pptx' or 'pptx_slides') in a worker process
+        Raises ExtractionTimeoutError on timeout and ExtractionError if the worker fails.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._idle.get()
+        try:
+            worker.conn.send((kind, content))
+            if not worker.conn.poll(timeout):
+                worker.kill()
+                worker = _Worker(self._context, self.memory_limit)
+                raise ExtractionTimeoutError(f"timed out after {timeout} seconds")
+            ok, result = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.kill()
+            worker = _Worker(self._context, self.memory_limit)
+            raise ExtractionError("extraction worker exited unexpectedly")
+        finally:
+            self._idle.put(worker)
+
+        if not ok:
+            raise ExtractionError(result)
+        return result
+
+    def close(self):
+        """
+        Stop all idle workers
+        """
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.kill()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_extraction_pool():
+    """
+    Get the shared extraction pool, starting its workers on first use
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+        return _pool
+
+def run_isolated_extraction(kind, content, timeout=None):
+    """
+    Run an extraction in the shared pool of isolated worker processes
+    """
+    return get_extraction_pool().extract(kind, content, timeout)
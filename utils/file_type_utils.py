@@ -0,0 +1,107 @@
+import threading
+import magic  # For better file type detection
+
+from utils.file_utils import TEXT_EXTENSIONS, OFFICE_EXTENSIONS, get_file_extension
+from utils.metrics_utils import get_latency_stats
+
+# Number of leading bytes inspected by the signature table and the null-byte heuristic
+SNIFF_BYTES = 1024
+
+# Magic-number signatures checked before falling back to libmagic: (offset, prefix, mime type)
+# Containers shared with Office formats (ZIP, OLE2) are deliberately left to libmagic.
+MAGIC_SIGNATURES = [
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (0, b'II*\x00', 'image/tiff'),
+    (0, b'MM\x00*', 'image/tiff'),
+    (0, b'\x00\x00\x01\x00', 'image/vnd.microsoft.icon'),
+    (0, b'RIFF', 'application/x-riff'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'fLaC', 'audio/flac'),
+    (4, b'ftyp', 'video/mp4'),
+    (0, b'\x1a\x45\xdf\xa3', 'video/webm'),
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'\x1f\x8b', 'application/gzip'),
+    (0, b'BZh', 'application/x-bzip2'),
+    (0, b'\xfd7zXZ\x00', 'application/x-xz'),
+    (0, b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (0, b'Rar!\x1a\x07', 'application/x-rar'),
+    (0, b'\x7fELF', 'application/x-executable'),
+    (0, b'\xca\xfe\xba\xbe', 'application/x-java-applet'),
+    (0, b'\xcf\xfa\xed\xfe', 'application/x-mach-binary'),
+    (0, b'\x00asm', 'application/wasm'),
+    (0, b'SQLite format 3\x00', 'application/vnd.sqlite3'),
+    (0, b'\xef\xbb\xbf', 'text/plain'),
+    (0, b'\xff\xfe', 'text/plain'),
+    (0, b'\xfe\xff', 'text/plain'),
+]
+
+# Substrings of MIME types for document formats we can extract text from
+DOCUMENT_MIME_MARKERS = ('word', 'pdf', 'powerpoint', 'excel', 'opendocument')
+
+DETECTION_STATS = get_latency_stats('file_type_detection')
+
+_local = threading.local()
+
+def get_magic_handle():
+    """
+    Return this thread's libmagic handle, creating it on first use
+    libmagic handles are not thread-safe, so each worker thread keeps its own.
+    """
+    handle = getattr(_local, 'magic', None)
+    if handle is None:
+        handle = magic.Magic(mime=True)
+        _local.magic = handle
+    return handle
+
+def match_signature(file_content):
+    """
+    Match the leading bytes of a file against MAGIC_SIGNATURES
+    Returns the MIME type, or None if no signature matches
+    """
+    head = bytes(file_content[:SNIFF_BYTES])
+    for offset, prefix, mime_type in MAGIC_SIGNATURES:
+        if head.startswith(prefix, offset):
+            return mime_type
+    return None
+
+def detect_mime_type(file_content):
+    """
+    Detect the MIME type of file content
+    Checks the signature table first and only calls libmagic when nothing matches.
+    Returns None if libmagic cannot identify the content.
+    """
+    mime_type = match_signature(file_content)
+    if mime_type is not None:
+        return mime_type
+
+    try:
+        return get_magic_handle().from_buffer(file_content)
+    except (magic.MagicException, OSError):
+        return None
+
+def is_binary_content(file_content, filename):
+    """
+    Check if a file is binary (non-text) based on its extension and content
+    Known text and Office extensions are accepted without reading the content.
+    """
+    with DETECTION_STATS.time():
+        ext = get_file_extension(filename)
+        if ext in TEXT_EXTENSIONS or ext in OFFICE_EXTENSIONS:
+            return False
+
+        mime_type = detect_mime_type(file_content)
+        if mime_type is None:
+            # If detection fails, use a simple heuristic: null bytes mean binary
+            return b'\0' in file_content[:SNIFF_BYTES]
+
+        return not mime_type.startswith('text/') and not any(marker in mime_type for marker in DOCUMENT_MIME_MARKERS)
+
+def get_detection_stats():
+    """
+    Return per-file detection latency statistics
+    """
+    return DETECTION_STATS.snapshot()
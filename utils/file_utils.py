@@ -1,15 +1,37 @@
 import os
-import base64
+import mimetypes
 import tempfile
 from pathlib import Path
 
-def create_download_link(content, filename, link_text):
+# Extensions of plain text and code files
+TEXT_EXTENSIONS = frozenset([
+    '.txt', '.py', '.js', '.html', '.css', '.md', '.json', '.xml', 
+    '.csv', '.c', '.cpp', '.h', '.java', '.php', '.rb', '.go', 
+    '.rs', '.ts', '.sh', '.bat', '.ps1', '.yaml', '.yml', 
+    '.toml', '.ini', '.cfg'
+])
+
+# Extensions of Office and PDF documents we extract text from
+OFFICE_EXTENSIONS = frozenset(['.docx', '.doc', '.pdf', '.pptx', '.ppt'])
+
+# MIME types of generated downloads that mimetypes may not know
+DOWNLOAD_MIME_TYPES = {
+    '.md': 'text/markdown',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.pdf': 'application/pdf',
+    '.zip': 'application/zip'
+}
+
+def get_download_mime_type(filename):
     """
-    Create a download link for text content
+    MIME type to serve a download with, based on its filename
     """
-    b64 = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:file/txt;base64,{b64}" download="{filename}">{link_text}</a>'
-    return href
+    extension = get_file_extension(filename)
+    if extension in DOWNLOAD_MIME_TYPES:
+        return DOWNLOAD_MIME_TYPES[extension]
+    if extension in TEXT_EXTENSIONS:
+        return 'text/plain'
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
 
 def save_to_project_folder(content, filename, folder_path):
     """
@@ -34,15 +56,7 @@ def is_text_file(filename):
     """
     Check if a file is likely to be a text file based on its extension
     """
-    text_extensions = [
-        '.txt', '.py', '.js', '.html', '.css', '.md', '.json', '.xml', 
-        '.csv', '.c', '.cpp', '.h', '.java', '.php', '.rb', '.go', 
-        '.rs', '.ts', '.sh', '.bat', '.ps1', '.yaml', '.yml', 
-        '.toml', '.ini', '.cfg'
-    ]
-    
-    ext = get_file_extension(filename)
-    return ext in text_extensions
+    return get_file_extension(filename) in TEXT_EXTENSIONS
 
 def get_common_filename(left_filename, right_filename):
     """
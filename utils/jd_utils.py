@@ -0,0 +1,188 @@
+import re
+import threading
+import time
+
+from utils.keyword_matcher import TOKEN_RE
+from utils.pool_utils import get_process_pool
+from utils.resume_utils import as_resume_document
+from utils.skill_taxonomy import JD_CATEGORIES, get_taxonomy
+
+# Batches smaller than this are analyzed in-process; larger ones go to the process pool
+PARALLEL_JD_BATCH = 64
+
+# Job descriptions sent to a pool worker per task
+JD_CHUNK_SIZE = 32
+
+# Bulleted lists following a skills or education lead-in, matched against lowercased text
+SKILLS_RE = re.compile(r'(?:skills|requirements|qualifications|experience with|proficiency in|knowledge of)(?:[^\n]*)((?:[\s]*[-•][\s]*[^\n]+[\n]?)+)')
+EDUCATION_RE = re.compile(r'(?:degree|bachelor|master|phd|bs|ms|b\.s\.|m\.s\.)(?:[^\n]*)((?:[\s]*[-•][\s]*[^\n]+[\n]?)+)')
+BULLET_RE = re.compile(r'[-•][\s]*([^\n]+)')
+EXPERIENCE_RE = re.compile(r'(\d+\+?)\s*(?:years|yrs)(?:\s*of)?\s*(?:experience|exp)')
+
+# Job title and company patterns, tried in order against the original text
+TITLE_RES = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'job title:?\s*([^\n]+)',
+    r'position:?\s*([^\n]+)',
+    r'role:?\s*([^\n]+)'
+)]
+
+# Fallback title pattern: a line ending in a role word. It backtracks quadratically
+# over colon-free text, so it only looks at the start of the JD, where titles appear.
+TITLE_FALLBACK_RE = re.compile(r'^([^:]+(?:engineer|developer|architect|scientist|analyst|manager|director|lead|head|chief|vp|president|officer|specialist|consultant|advisor))[\s\n]', re.IGNORECASE | re.MULTILINE)
+TITLE_SCAN_CHARS = 2000
+
+COMPANY_RES = [re.compile(pattern) for pattern in (
+    r'(?:at|with|for|join)\s+([A-Z][A-Za-z0-9\s&]+)(?:[\.,]|\s+is|\s+as|\s+to)',
+    r'about\s+([A-Z][A-Za-z0-9\s&]+)(?:[\.,]|\s+is|\s+as|\s+to)',
+    r'([A-Z][A-Za-z0-9\s&]+)\s+is\s+(?:looking|seeking|hiring)',
+)]
+
+def _bullet_items(pattern, text):
+    items = []
+    for match in pattern.findall(text):
+        items.extend(item.strip() for item in BULLET_RE.findall(match) if item.strip())
+    return items
+
+def _first_match(patterns, text):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+class JDAnalyzer:
+    """
+    Extracts key requirements from job descriptions with precompiled patterns
+    Each job description is lowercased once; technologies come from the skill taxonomy.
+    """
+
+    def __init__(self, taxonomy=None):
+        self.taxonomy = taxonomy or get_taxonomy()
+
+    def _technologies(self, lower_text):
+        found = self.taxonomy.find_in_tokens(TOKEN_RE.findall(lower_text), JD_CATEGORIES)
+        return [skill for skill in self.taxonomy.matcher.labels if skill in found]
+
+    def _job_title(self, jd_text):
+        job_title = _first_match(TITLE_RES, jd_text)
+        if job_title is None:
+            job_title = _first_match([TITLE_FALLBACK_RE], jd_text[:TITLE_SCAN_CHARS])
+        return "Not specified" if job_title is None else job_title
+
+    def _company_name(self, jd_text):
+        company_name = _first_match(COMPANY_RES, jd_text)
+        return "Not specified" if company_name is None else company_name
+
+    def analyze(self, jd_text):
+        """
+        Analyze one job description
+        Returns a dictionary with the job title, company name, skills, technologies,
+        years of experience and education requirements
+        """
+        lower_text = jd_text.lower()
+        experience = EXPERIENCE_RE.search(lower_text)
+        return {
+            "job_title": self._job_title(jd_text),
+            "company_name": self._company_name(jd_text),
+            "skills": _bullet_items(SKILLS_RE, lower_text),
+            "technologies": self._technologies(lower_text),
+            "experience": experience.group(1) if experience else "Not specified",
+            "education": _bullet_items(EDUCATION_RE, lower_text)
+        }
+
+    def analyze_batch(self, jd_texts, parallel_threshold=PARALLEL_JD_BATCH, chunk_size=JD_CHUNK_SIZE):
+        """
+        Analyze many job descriptions, across the shared process pool for large batches
+        Returns a dictionary with the per-JD 'results' (in input order), the 'count',
+        the elapsed 'seconds' and the throughput in 'jds_per_second'.
+        """
+        jd_texts = list(jd_texts)
+        start = time.perf_counter()
+        if len(jd_texts) >= parallel_threshold:
+            chunks = [jd_texts[i:i + chunk_size] for i in range(0, len(jd_texts), chunk_size)]
+            results = [result for chunk in get_process_pool().map(_analyze_chunk, chunks) for result in chunk]
+        else:
+            results = [self.analyze(jd_text) for jd_text in jd_texts]
+        seconds = time.perf_counter() - start
+        return {
+            'results': results,
+            'count': len(results),
+            'seconds': seconds,
+            'jds_per_second': len(results) / seconds if seconds > 0 else 0.0
+        }
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def get_jd_analyzer():
+    """
+    Get the process-wide JDAnalyzer, building it on first use
+    """
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = JDAnalyzer()
+        return _analyzer
+
+def _analyze_chunk(jd_texts):
+    analyzer = get_jd_analyzer()
+    return [analyzer.analyze(jd_text) for jd_text in jd_texts]
+
+def analyze_jd(jd_text):
+    """
+    Analyze one job description with the process-wide analyzer
+    """
+    return get_jd_analyzer().analyze(jd_text)
+
+def analyze_jds(jd_texts):
+    """
+    Analyze a batch of job descriptions with the process-wide analyzer
+    """
+    return get_jd_analyzer().analyze_batch(jd_texts)
+
+def jd_requirements(jd_analysis):
+    """
+    Prepare the requirements of an analyzed job description for indexed matching
+    Returns a list of (kind, label, tokens) tuples, kind being 'skill' or 'technology'
+    """
+    requirements = [('skill', skill.strip(), tuple(TOKEN_RE.findall(skill.strip().lower()))) for skill in jd_analysis["skills"]]
+    requirements.extend(('technology', tech.strip(), None) for tech in jd_analysis["technologies"])
+    return requirements
+
+def match_requirements(resume, requirements):
+    """
+    Check prepared job description requirements against a resume
+    resume may be text or a ResumeDocument. Skills are phrase lookups in the resume's
+    n-gram index and technologies are lookups in its taxonomy skill hits.
+    Returns a dictionary of matching and missing skills and technologies, and the
+    match percentage
+    """
+    resume = as_resume_document(resume)
+    result = {'matching_skills': [], 'missing_skills': [], 'matching_tech': [], 'missing_tech': []}
+    for kind, label, tokens in requirements:
+        if kind == 'skill':
+            found = not label or resume.contains_phrase(tokens)
+            result['matching_skills' if found else 'missing_skills'].append(label)
+        else:
+            found = not label or label.lower() in resume.skill_hits
+            result['matching_tech' if found else 'missing_tech'].append(label)
+
+    matching_count = len(result['matching_skills']) + len(result['matching_tech'])
+    result['match_percentage'] = round((matching_count / len(requirements)) * 100) if requirements else 0
+    return result
+
+def match_resume_to_jd(resume, jd_analysis):
+    """
+    Gap analysis of one resume against one analyzed job description
+    """
+    return match_requirements(resume, jd_requirements(jd_analysis))
+
+def coverage_matrix(resumes, jd_analyses):
+    """
+    Evaluate M resumes against N analyzed job descriptions in one call
+    Each resume is indexed once and each job description's requirements are prepared
+    once. Returns an M x N list of match dictionaries, one row per resume.
+    """
+    documents = [as_resume_document(resume) for resume in resumes]
+    requirements = [jd_requirements(jd_analysis) for jd_analysis in jd_analyses]
+    return [[match_requirements(document, prepared) for prepared in requirements] for document in documents]
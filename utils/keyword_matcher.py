@@ -0,0 +1,88 @@
+import re
+from collections import deque
+
+# Words, or single punctuation characters such as the '+' in 'c++' or the '/' in 'ci/cd'
+TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+def tokenize(text):
+    """
+    Split text into lowercase word and punctuation tokens
+    """
+    return TOKEN_RE.findall(text.lower())
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton that finds many keywords in a single pass over a text
+    The automaton runs over word tokens rather than characters, so every match starts
+    and ends on a word boundary. Keywords may be plain strings or (keyword, label)
+    pairs; matches are reported by label.
+    """
+
+    def __init__(self, keywords):
+        self.labels = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        seen_labels = set()
+        for item in keywords:
+            keyword, label = (item, item) if isinstance(item, str) else item
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            self._add(tokens, label)
+            if label not in seen_labels:
+                seen_labels.add(label)
+                self.labels.append(label)
+
+        self._build_failure_links()
+
+    def _add(self, tokens, label):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        if label not in self._out[state]:
+            self._out[state] = self._out[state] + (label,)
+
+    def _build_failure_links(self):
+        goto, fail, out = self._goto, self._fail, self._out
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for token, next_state in goto[state].items():
+                pending.append(next_state)
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(token, 0)
+                if out[fail[next_state]]:
+                    out[next_state] = out[next_state] + out[fail[next_state]]
+
+    def find_all(self, text):
+        """
+        Return the set of labels whose keywords occur in the text
+        """
+        return self.find_in_tokens(tokenize(text))
+
+    def find_in_tokens(self, tokens):
+        """
+        Return the set of labels whose keywords occur in an already tokenized text
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        found = set()
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0) if state else root.get(token, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
@@ -0,0 +1,107 @@
+import mmap
+import os
+from array import array
+
+import numpy as np
+
+from utils.encoding_utils import detect_encoding
+
+# Bytes scanned per vectorized newline search
+SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Encodings whose newline is not a single 0x0A byte, so the byte index would be wrong
+UNSUPPORTED_ENCODINGS = ('utf-16', 'utf-16-le', 'utf-16-be', 'utf-32')
+
+def build_line_index(buffer, start=0, chunk_size=SCAN_CHUNK_SIZE):
+    """
+    Build an index of line start offsets for a byte buffer
+    Newlines are found with a vectorized scan, one chunk at a time.
+    Returns an array('Q') whose first entry is start and whose remaining entries
+    are the offsets just past each newline.
+    """
+    offsets = array('Q', [start])
+    size = len(buffer)
+    for chunk_start in range(start, size, chunk_size):
+        count = min(chunk_size, size - chunk_start)
+        chunk = np.frombuffer(buffer, dtype=np.uint8, count=count, offset=chunk_start)
+        positions = np.flatnonzero(chunk == 0x0A)
+        positions += chunk_start + 1
+        offsets.frombytes(positions.astype(np.uint64).tobytes())
+
+        # Drop scanned pages from the resident set; they are re-read on demand
+        if isinstance(buffer, mmap.mmap) and hasattr(mmap, 'MADV_DONTNEED'):
+            aligned_start = chunk_start - chunk_start % mmap.PAGESIZE
+            buffer.madvise(mmap.MADV_DONTNEED, aligned_start, chunk_start + count - aligned_start)
+    return offsets
+
+class MappedLines:
+    """
+    Lazy, read-only sequence of the lines of an on-disk text file
+    The file is memory-mapped and only a compact line-offset index is kept in memory;
+    lines are decoded on access. Lines behave like str.splitlines() on '\\n' and '\\r\\n'.
+    This keeps the file itself out of memory while it is indexed and read; a consumer
+    that holds every line, such as difflib, still needs memory for all of them.
+    """
+
+    def __init__(self, path, encoding=None):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+        self.encoding = encoding or detect_encoding(self._map)
+        if self.encoding in UNSUPPORTED_ENCODINGS:
+            self.close()
+            raise ValueError(f"Memory-mapped line access does not support {self.encoding} files")
+
+        start = 3 if self.encoding == 'utf-8-sig' and size >= 3 else 0
+        self._offsets = build_line_index(self._map, start)
+        self._size = size
+
+        # A trailing newline doesn't start another line, matching str.splitlines()
+        self._count = len(self._offsets)
+        if self._offsets[-1] == size:
+            self._count -= 1
+
+    def __len__(self):
+        return self._count
+
+    def _line(self, index):
+        start = self._offsets[index]
+        end = self._offsets[index + 1] - 1 if index + 1 < len(self._offsets) else self._size
+        if end > start and self._map[end - 1] == 0x0D:
+            end -= 1
+        return self._map[start:end].decode(self.encoding, errors='replace')
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("line index out of range")
+        return self._line(index)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._line(index)
+
+    def close(self):
+        """
+        Release the memory map and the underlying file
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def open_text_lines(path, encoding=None):
+    """
+    Open an on-disk text file for lazy line access
+    """
+    return MappedLines(path, encoding)
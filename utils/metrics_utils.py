@@ -0,0 +1,79 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class LatencyStats:
+    """
+    Thread-safe running latency statistics for one named operation
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all recorded samples
+        """
+        with self._lock:
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+            self.last = 0.0
+
+    def record(self, seconds):
+        """
+        Record one sample, in seconds
+        """
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    @contextmanager
+    def time(self):
+        """
+        Context manager that records the wall time of its block
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def snapshot(self):
+        """
+        Return the current statistics as a dictionary (latencies in milliseconds)
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'count': self.count,
+                'total_ms': self.total * 1000,
+                'mean_ms': (self.total / self.count) * 1000 if self.count else 0.0,
+                'max_ms': self.max * 1000,
+                'last_ms': self.last * 1000
+            }
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def get_latency_stats(name):
+    """
+    Get the process-wide LatencyStats for a name, creating it on first use
+    """
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = LatencyStats(name)
+        return _registry[name]
+
+def latency_snapshot():
+    """
+    Return snapshots of every registered LatencyStats, keyed by name
+    """
+    with _registry_lock:
+        stats = list(_registry.values())
+    return {item.name: item.snapshot() for item in stats}
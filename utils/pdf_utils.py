@@ -0,0 +1,76 @@
+import io
+import subprocess
+import threading
+import time
+
+import PyPDF2
+
+from utils.metrics_utils import get_latency_stats
+
+# Seconds a single pdftotext run may take before it is killed
+PDFTOTEXT_TIMEOUT = 30
+
+# Maximum pdftotext processes running at once across the application
+PDFTOTEXT_CONCURRENCY = 4
+
+# Latency statistics for each engine, recorded only for extractions that engine served
+PDFTOTEXT_STATS = get_latency_stats('pdf_extraction.pdftotext')
+PYPDF2_STATS = get_latency_stats('pdf_extraction.pypdf2')
+
+_pdftotext_slots = threading.BoundedSemaphore(PDFTOTEXT_CONCURRENCY)
+
+def pdftotext_command(layout=False, first_page=None, last_page=None):
+    """
+    Build a pdftotext command that reads the PDF from stdin and writes text to stdout
+    """
+    command = ['pdftotext', '-enc', 'UTF-8']
+    if layout:
+        command.append('-layout')
+    if first_page is not None:
+        command.extend(['-f', str(first_page)])
+    if last_page is not None:
+        command.extend(['-l', str(last_page)])
+    return command + ['-', '-']
+
+def extract_with_pdftotext(file_content, layout=False, first_page=None, last_page=None, timeout=PDFTOTEXT_TIMEOUT):
+    """
+    Extract text from PDF bytes with poppler's pdftotext, piped through stdin and stdout
+    At most PDFTOTEXT_CONCURRENCY runs happen at once; callers beyond that wait for a slot.
+    Raises subprocess.TimeoutExpired, subprocess.CalledProcessError or OSError on failure.
+    """
+    command = pdftotext_command(layout, first_page, last_page)
+    with _pdftotext_slots:
+        start = time.perf_counter()
+        result = subprocess.run(command, input=file_content, capture_output=True, timeout=timeout, check=True)
+        PDFTOTEXT_STATS.record(time.perf_counter() - start)
+    return result.stdout.decode('utf-8', errors='replace')
+
+def extract_with_pypdf2(file_content, first_page=None, last_page=None):
+    """
+    Extract text from PDF bytes with PyPDF2
+    Page numbers are 1-based and clamped to the document, like pdftotext's -f and -l.
+    """
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    page_count = len(pdf_reader.pages)
+    first = max(first_page or 1, 1) - 1
+    last = min(last_page or page_count, page_count)
+    return ''.join(pdf_reader.pages[page_num].extract_text() for page_num in range(first, last))
+
+def extract_pdf_text(file_content, layout=False, first_page=None, last_page=None, timeout=PDFTOTEXT_TIMEOUT, fallback=extract_with_pypdf2):
+    """
+    Extract text from PDF bytes, preferring pdftotext and falling back to PyPDF2
+    fallback(file_content, first_page, last_page) runs the PyPDF2 extraction; pass one
+    that runs it elsewhere, such as in an isolated worker process.
+    Returns (text, engine), where engine is 'pdftotext' or 'pypdf2'.
+    """
+    try:
+        return extract_with_pdftotext(file_content, layout, first_page, last_page, timeout), 'pdftotext'
+    except (subprocess.SubprocessError, OSError):
+        with PYPDF2_STATS.time():
+            return fallback(file_content, first_page, last_page), 'pypdf2'
+
+def get_pdf_extraction_stats():
+    """
+    Return latency snapshots for each PDF extraction engine, keyed by engine
+    """
+    return {'pdftotext': PDFTOTEXT_STATS.snapshot(), 'pypdf2': PYPDF2_STATS.snapshot()}
@@ -0,0 +1,42 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Worker processes in the shared CPU pool
+POOL_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def get_process_pool():
+    """
+    Get the shared process pool for CPU-bound work, starting it on first use
+    Workers are spawned rather than forked, which is safe from Streamlit's threads.
+    A pool broken by a worker that died (out of memory, a crashing renderer) is shut
+    down and replaced, so later work doesn't fail with BrokenProcessPool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and getattr(_pool, '_broken', False):
+            _shutdown_pool()
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def shutdown_process_pool():
+    """
+    Shut down the shared process pool; it is restarted on next use
+    """
+    with _pool_lock:
+        _shutdown_pool()
+
+# Stop the workers when the app or service exits
+atexit.register(shutdown_process_pool)
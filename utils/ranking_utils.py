@@ -0,0 +1,144 @@
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from utils.keyword_matcher import tokenize
+from utils.skill_taxonomy import JD_CATEGORIES, get_taxonomy
+
+# Share of the score that comes from skill coverage; the rest is TF-IDF text similarity
+SKILL_WEIGHT = 0.7
+
+def _term_tokens(tokens):
+    """
+    Word tokens used for TF-IDF, skipping punctuation and single characters
+    """
+    return [token for token in tokens if len(token) > 1 and token[0].isalnum()]
+
+def _l2_normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+class ResumeCorpus:
+    """
+    A set of resumes vectorized once for ranking against job descriptions
+    Holds a binary resume-by-skill matrix over the skill taxonomy and an
+    L2-normalized TF-IDF matrix, both as sparse CSR matrices.
+    """
+
+    def __init__(self, names, texts, taxonomy=None):
+        self.names = list(names)
+        self.taxonomy = taxonomy or get_taxonomy()
+        self.skills = self.taxonomy.skills()
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+
+        # Each resume is tokenized once and shared by the skill and TF-IDF passes
+        token_lists = [tokenize(text) for text in texts]
+        self.skill_matrix = self._skill_rows(token_lists)
+
+        # Vocabulary and document frequencies come from the resumes only
+        self.vocabulary = {}
+        counts = self._term_rows(token_lists, grow_vocabulary=True)
+        document_frequency = np.bincount(counts.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(self.names)) / (1 + document_frequency)) + 1.0
+        self.tfidf = _l2_normalize_rows(counts @ sparse.diags(self.idf)).tocsr()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _skill_rows(self, token_lists):
+        indptr = [0]
+        indices = []
+        for tokens in token_lists:
+            indices.extend(self.skill_index[skill] for skill in self.taxonomy.find_in_tokens(tokens))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.skills)))
+
+    def _term_rows(self, token_lists, grow_vocabulary=False):
+        vocabulary = self.vocabulary
+        indptr = [0]
+        indices = []
+        data = []
+        for tokens in token_lists:
+            for token, count in Counter(_term_tokens(tokens)).items():
+                column = vocabulary.get(token)
+                if column is None:
+                    if not grow_vocabulary:
+                        continue
+                    column = vocabulary[token] = len(vocabulary)
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        # Sublinear term frequency: 1 + log(count)
+        data = 1.0 + np.log(np.asarray(data, dtype=np.float64))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(vocabulary)))
+
+    def vectorize_jds(self, jd_texts):
+        """
+        Vectorize job descriptions into the corpus skill and TF-IDF spaces
+        Returns (jd_skill_matrix, jd_tfidf_matrix).
+        """
+        token_lists = [tokenize(text) for text in jd_texts]
+        jd_skill_rows = [self.taxonomy.find_in_tokens(tokens, JD_CATEGORIES) for tokens in token_lists]
+        indptr = np.cumsum([0] + [len(row) for row in jd_skill_rows])
+        indices = [self.skill_index[skill] for row in jd_skill_rows for skill in row]
+        jd_skills = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(jd_texts), len(self.skills)))
+
+        jd_terms = self._term_rows(token_lists) @ sparse.diags(self.idf)
+        return jd_skills, _l2_normalize_rows(jd_terms).tocsr()
+
+    def score(self, jd_texts, skill_weight=SKILL_WEIGHT):
+        """
+        Score every resume against every job description with one sparse matrix product
+        Returns a dense (resumes x job descriptions) array of scores between 0 and 1.
+        """
+        jd_skills, jd_tfidf = self.vectorize_jds(jd_texts)
+
+        # Fold the per-JD skill count and the weights into the JD side of the product
+        skill_counts = np.asarray(jd_skills.sum(axis=1)).ravel()
+        skill_counts[skill_counts == 0] = 1.0
+        jd_side = sparse.hstack([
+            sparse.diags(skill_weight / skill_counts) @ jd_skills,
+            (1.0 - skill_weight) * jd_tfidf
+        ]).tocsr()
+        resume_side = sparse.hstack([self.skill_matrix, self.tfidf]).tocsr()
+
+        return (resume_side @ jd_side.T).toarray()
+
+    def resume_skills(self, row):
+        """
+        Canonical skills found in one resume
+        """
+        start, end = self.skill_matrix.indptr[row], self.skill_matrix.indptr[row + 1]
+        return {self.skills[i] for i in self.skill_matrix.indices[start:end]}
+
+def rank_resumes(corpus, jd_text, top_k=10, skill_weight=SKILL_WEIGHT):
+    """
+    Rank a ResumeCorpus against one job description
+    Returns the top_k resumes, best first, as dictionaries with the score and a
+    per-skill breakdown of matched and missing job description skills.
+    """
+    if not len(corpus):
+        return []
+
+    scores = corpus.score([jd_text], skill_weight)[:, 0]
+    top_k = min(top_k, len(scores))
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+
+    jd_skills = corpus.taxonomy.find_skills(jd_text, JD_CATEGORIES)
+    results = []
+    for rank, row in enumerate(top, start=1):
+        found = corpus.resume_skills(row)
+        matched = [skill for skill in jd_skills if skill in found]
+        results.append({
+            'rank': rank,
+            'name': corpus.names[row],
+            'score': float(scores[row]),
+            'skill_coverage': len(matched) / len(jd_skills) if jd_skills else 0.0,
+            'matched_skills': matched,
+            'missing_skills': [skill for skill in jd_skills if skill not in found]
+        })
+    return results
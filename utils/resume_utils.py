@@ -1,101 +1,324 @@
 import re
 import difflib
-from collections import defaultdict
 
-def extract_resume_sections(text):
+from utils.keyword_matcher import TOKEN_RE
+from utils.pool_utils import get_process_pool
+from utils.skill_taxonomy import RESUME_CATEGORIES, get_taxonomy
+
+# Common section headers in resumes, in priority order
+SECTION_PATTERNS = [
+    (r'(?:professional\s+)?summary|profile', 'summary'),
+    (r'objective', 'objective'),
+    (r'(?:work\s+|professional\s+)?experience|employment(?:\s+history)?', 'experience'),
+    (r'education(?:al)?(?:\s+background)?', 'education'),
+    (r'skills|technical\s+skills|core\s+competencies', 'skills'),
+    (r'certifications?|licenses?', 'certifications'),
+    (r'projects?', 'projects'),
+    (r'publications?', 'publications'),
+    (r'awards?|honors?|achievements?', 'awards'),
+    (r'languages?', 'languages'),
+    (r'references?', 'references'),
+    (r'volunteer(?:ing)?|community(?:\s+service)?', 'volunteer')
+]
+
+# All section headers as one alternation with a named group per section.
+# Each group keeps the original `pattern[:\s]*$` shape, so only a pattern's last
+# alternative has to span the whole line, exactly as when matched one at a time.
+SECTION_HEADER_RE = re.compile(
+    '|'.join(f'(?P<{section_name}>{pattern}[:\\s]*$)' for pattern, section_name in SECTION_PATTERNS),
+    re.IGNORECASE
+)
+
+# Sections whose token-pair count exceeds this use shingle overlap instead of an exact ratio
+SIMILARITY_COST_CEILING = 250000
+
+# Similarity upper bounds below this are reported as-is, without computing the exact ratio
+SIMILARITY_FLOOR = 0.2
+
+# Lines that may be headings we don't recognize: 'Heading:' or an all-caps 'HEADING'
+UNKNOWN_HEADING_RE = re.compile(r'(?:[A-Za-z][A-Za-z &/-]{0,39}:|[A-Z][A-Z &/-]{3,39})$')
+
+# Line prefixes that mark a bulleted line
+BULLET_PREFIXES = ('-', '*', '\u2022', '\u25cf', '\u25aa', '\u25e6', '\u2013')
+
+def _unknown_heading_name(line):
+    """
+    Section name for an unrecognized heading line, or None if it doesn't look like one
+    """
+    if len(line.split()) > 5 or not UNKNOWN_HEADING_RE.match(line):
+        return None
+    return ' '.join(line.rstrip(':').lower().split())
+
+def _opens_block(next_line):
+    """
+    Whether the raw line after a candidate heading sets it apart: a blank line, or
+    indented or bulleted content
+    """
+    return next_line is None or not next_line.strip() or next_line[:1].isspace() or next_line.lstrip().startswith(BULLET_PREFIXES)
+
+# Minimum content similarity for pairing leftover sections with different names
+SECTION_ALIGNMENT_THRESHOLD = 0.5
+
+# Total section lines above which per-section diffs run in the process pool
+PARALLEL_SECTION_DIFF_LINES = 2000
+
+def extract_resume_sections(text, keep_unknown_headings=False):
     """
     Extract common sections from a resume text
+    With keep_unknown_headings, unrecognized heading-like lines start a section of their
+    own (named after the heading) instead of being added to the current section. Inside a
+    recognized section they only do so when followed by a blank line or by indented or
+    bulleted content, so capitalized employer names and job titles stay in place:
+
+    >>> sections = extract_resume_sections(
+    ...     "Experience\\nACME CORPORATION\\nBuilt things\\nLocation: Remote\\n"
+    ...     "SENIOR ENGINEER\\nDid stuff\\nEducation\\nMIT", keep_unknown_headings=True)
+    >>> sorted(sections)
+    ['education', 'experience']
+    >>> sections['experience'].split('\\n')[0]
+    'ACME CORPORATION'
+
     Returns a dictionary with section names as keys and content as values
     """
-    # Common section headers in resumes
-    section_patterns = [
-        (r'(?i)(?:professional\s+)?summary|profile', 'summary'),
-        (r'(?i)objective', 'objective'),
-        (r'(?i)(?:work\s+|professional\s+)?experience|employment(?:\s+history)?', 'experience'),
-        (r'(?i)education(?:al)?(?:\s+background)?', 'education'),
-        (r'(?i)skills|technical\s+skills|core\s+competencies', 'skills'),
-        (r'(?i)certifications?|licenses?', 'certifications'),
-        (r'(?i)projects?', 'projects'),
-        (r'(?i)publications?', 'publications'),
-        (r'(?i)awards?|honors?|achievements?', 'awards'),
-        (r'(?i)languages?', 'languages'),
-        (r'(?i)references?', 'references'),
-        (r'(?i)volunteer(?:ing)?|community(?:\s+service)?', 'volunteer')
-    ]
-    
-    # Split text into lines
-    lines = text.split('\n')
-    
-    # Initialize sections dictionary
-    sections = defaultdict(str)
+    match_header = SECTION_HEADER_RE.match
+    sections = {}
     current_section = 'other'
+    current_lines = None
+    in_known_section = False
     
-    # Process each line
-    for i, line in enumerate(lines):
-        line = line.strip()
+    raw_lines = text.split('\n')
+    for index, raw_line in enumerate(raw_lines):
+        line = raw_line.strip()
         if not line:
             continue
         
         # Check if this line is a section header
-        section_found = False
-        for pattern, section_name in section_patterns:
-            if re.match(f'^{pattern}[:\s]*$', line, re.IGNORECASE):
-                current_section = section_name
-                section_found = True
-                break
+        header = match_header(line)
+        section_name = header.lastgroup if header else None
+        if section_name:
+            in_known_section = True
+        elif keep_unknown_headings:
+            next_line = raw_lines[index + 1] if index + 1 < len(raw_lines) else None
+            if not in_known_section or _opens_block(next_line):
+                section_name = _unknown_heading_name(line)
+                if section_name:
+                    in_known_section = False
+        if section_name:
+            current_section = section_name
+            current_lines = sections.get(current_section)
+            continue
         
-        if not section_found:
-            # Add content to current section
-            sections[current_section] += line + '\n'
-    
-    # Clean up sections
-    for section in sections:
-        sections[section] = sections[section].strip()
+        # Add content to current section; sections are created on their first line
+        if current_lines is None:
+            current_lines = sections[current_section] = []
+        current_lines.append(line)
     
-    return dict(sections)
+    return {section: '\n'.join(lines) for section, lines in sections.items()}
+
+# Longest token sequence indexed for phrase lookups; longer phrases are searched in the token text
+MAX_INDEXED_NGRAM = 5
+
+class ResumeDocument:
+    """
+    A resume parsed once and shared by every resume feature
+    Holds the original and lowercased text; tokens, the phrase index, sections (including
+    unrecognized headings) and taxonomy skill hits are computed on first use and then kept.
+    """
+    __slots__ = ('filename', 'text', 'lower_text', '_tokens', '_ngrams', '_token_text', '_sections', '_skill_hits')
+
+    def __init__(self, text, filename=''):
+        self.filename = filename
+        self.text = text
+        self.lower_text = text.lower()
+        self._tokens = None
+        self._ngrams = None
+        self._token_text = None
+        self._sections = None
+        self._skill_hits = None
+
+    @property
+    def tokens(self):
+        """
+        Lowercase word and punctuation tokens, as produced by keyword_matcher.tokenize
+        """
+        if self._tokens is None:
+            self._tokens = TOKEN_RE.findall(self.lower_text)
+        return self._tokens
+
+    @property
+    def ngrams(self):
+        """
+        Set of every token sequence of up to MAX_INDEXED_NGRAM tokens, as tuples
+        """
+        if self._ngrams is None:
+            tokens = self.tokens
+            self._ngrams = {tuple(tokens[i:i + n]) for n in range(1, MAX_INDEXED_NGRAM + 1) for i in range(len(tokens) - n + 1)}
+        return self._ngrams
+
+    def contains_phrase(self, phrase_tokens):
+        """
+        Check whether a tokenized phrase occurs in the resume on token boundaries
+        Short phrases are a single set lookup in the n-gram index.
+        """
+        phrase_tokens = tuple(phrase_tokens)
+        if len(phrase_tokens) <= MAX_INDEXED_NGRAM:
+            return phrase_tokens in self.ngrams
+        if self._token_text is None:
+            self._token_text = ' ' + ' '.join(self.tokens) + ' '
+        return ' ' + ' '.join(phrase_tokens) + ' ' in self._token_text
+
+    @property
+    def sections(self):
+        """
+        Sections as returned by extract_resume_sections with keep_unknown_headings
+        """
+        if self._sections is None:
+            self._sections = extract_resume_sections(self.text, keep_unknown_headings=True)
+        return self._sections
+
+    @property
+    def skill_hits(self):
+        """
+        Set of canonical taxonomy skills mentioned anywhere in the resume, in any category
+        """
+        if self._skill_hits is None:
+            self._skill_hits = get_taxonomy().find_in_tokens(self.tokens)
+        return self._skill_hits
+
+    def skills(self, categories=RESUME_CATEGORIES):
+        """
+        Canonical skills of the given categories, in taxonomy order
+        """
+        taxonomy = get_taxonomy()
+        hits = self.skill_hits
+        return [skill for skill in taxonomy.skills(categories) if skill in hits]
+
+def as_resume_document(resume, filename=''):
+    """
+    Return a ResumeDocument for either resume text or an existing ResumeDocument
+    """
+    if isinstance(resume, ResumeDocument):
+        return resume
+    return ResumeDocument(resume, filename)
+
+def _shingle_similarity(left_tokens, right_tokens):
+    """
+    Dice coefficient over word-bigram shingles; linear in the section length
+    """
+    left_shingles = set(zip(left_tokens, left_tokens[1:])) or {tuple(left_tokens)}
+    right_shingles = set(zip(right_tokens, right_tokens[1:])) or {tuple(right_tokens)}
+    return 2.0 * len(left_shingles & right_shingles) / (len(left_shingles) + len(right_shingles))
+
+def section_similarity(left_content, right_content, cost_ceiling=SIMILARITY_COST_CEILING):
+    """
+    Similarity between two section bodies, between 0 and 1, at bounded cost
+    Compares word tokens rather than characters. The cheap difflib upper bounds are
+    tried first and returned when already below SIMILARITY_FLOOR; sections whose
+    token-pair count exceeds cost_ceiling use shingle overlap instead of an exact ratio.
+    """
+    left_tokens = left_content.split()
+    right_tokens = right_content.split()
+    if not left_tokens or not right_tokens:
+        return 1.0 if left_tokens == right_tokens else 0.0
+
+    matcher = difflib.SequenceMatcher(None, left_tokens, right_tokens, autojunk=False)
+    upper_bound = matcher.real_quick_ratio()
+    if upper_bound < SIMILARITY_FLOOR:
+        return upper_bound
+    upper_bound = matcher.quick_ratio()
+    if upper_bound < SIMILARITY_FLOOR:
+        return upper_bound
 
-def compare_resume_sections(left_text, right_text):
+    if len(left_tokens) * len(right_tokens) > cost_ceiling:
+        return min(upper_bound, _shingle_similarity(left_tokens, right_tokens))
+    return matcher.ratio()
+
+def align_resume_sections(left_sections, right_sections, threshold=SECTION_ALIGNMENT_THRESHOLD):
+    """
+    Pair the sections of two resumes
+    Sections are paired by name first; leftover sections are then paired by content
+    similarity, most similar first, so renamed or reordered headings still line up.
+    Returns a list of (left_name, right_name, similarity) tuples where either name may be None.
+    Similarity is None for pairs matched by name.
+    """
+    pairs = [(name, name, None) for name in left_sections if name in right_sections]
+    left_leftover = [name for name in left_sections if name not in right_sections]
+    right_leftover = [name for name in right_sections if name not in left_sections]
+
+    scored = []
+    for left_name in left_leftover:
+        for right_name in right_leftover:
+            similarity = section_similarity(left_sections[left_name], right_sections[right_name])
+            if similarity >= threshold:
+                scored.append((-similarity, left_name, right_name))
+    scored.sort()
+
+    paired_left = set()
+    paired_right = set()
+    for negative_similarity, left_name, right_name in scored:
+        if left_name in paired_left or right_name in paired_right:
+            continue
+        paired_left.add(left_name)
+        paired_right.add(right_name)
+        pairs.append((left_name, right_name, -negative_similarity))
+
+    pairs.extend((name, None, 0.0) for name in left_leftover if name not in paired_left)
+    pairs.extend((None, name, 0.0) for name in right_leftover if name not in paired_right)
+    return pairs
+
+def _diff_section(contents):
+    left_content, right_content = contents
+    return list(difflib.Differ().compare(left_content.splitlines(), right_content.splitlines()))
+
+def compare_resume_sections(left_text, right_text, parallel=True):
     """
     Compare two resumes section by section
+    Either side may be text or a ResumeDocument. With parallel unset, sections are always
+    diffed in this process, e.g. when already running in a pool worker.
     Returns a dictionary with section comparisons
     """
-    # Extract sections from both resumes
-    left_sections = extract_resume_sections(left_text)
-    right_sections = extract_resume_sections(right_text)
+    # Sections keep unrecognized headings as their own sections
+    left_sections = as_resume_document(left_text).sections
+    right_sections = as_resume_document(right_text).sections
     
-    # Get all unique section names
-    all_sections = set(list(left_sections.keys()) + list(right_sections.keys()))
+    pairs = align_resume_sections(left_sections, right_sections)
+    
+    # Diff the paired sections, across the process pool when there is enough work
+    paired = [(left_sections[left], right_sections[right]) for left, right, _ in pairs if left and right]
+    total_lines = sum(left.count('\n') + right.count('\n') + 2 for left, right in paired)
+    if parallel and len(paired) > 1 and total_lines >= PARALLEL_SECTION_DIFF_LINES:
+        diffs = iter(list(get_process_pool().map(_diff_section, paired)))
+    else:
+        diffs = iter([_diff_section(contents) for contents in paired])
     
     # Compare each section
     section_comparisons = {}
-    for section in all_sections:
-        left_content = left_sections.get(section, '')
-        right_content = right_sections.get(section, '')
-        
-        if left_content and right_content:
+    for left_name, right_name, similarity in pairs:
+        if left_name and right_name:
             # Both resumes have this section, compare them
-            differ = difflib.Differ()
-            diff = list(differ.compare(left_content.splitlines(), right_content.splitlines()))
+            left_content = left_sections[left_name]
+            right_content = right_sections[right_name]
+            section = left_name if left_name == right_name else f"{left_name} / {right_name}"
             section_comparisons[section] = {
                 'left_only': False,
                 'right_only': False,
-                'diff': diff,
-                'similarity': difflib.SequenceMatcher(None, left_content, right_content).ratio()
+                'diff': next(diffs),
+                'similarity': section_similarity(left_content, right_content) if similarity is None else similarity
             }
-        elif left_content:
+        elif left_name:
             # Only left resume has this section
-            section_comparisons[section] = {
+            section_comparisons[left_name] = {
                 'left_only': True,
                 'right_only': False,
-                'diff': [f"- {line}" for line in left_content.splitlines()],
+                'diff': [f"- {line}" for line in left_sections[left_name].splitlines()],
                 'similarity': 0.0
             }
         else:
             # Only right resume has this section
-            section_comparisons[section] = {
+            section_comparisons[right_name] = {
                 'left_only': False,
                 'right_only': True,
-                'diff': [f"+ {line}" for line in right_content.splitlines()],
+                'diff': [f"+ {line}" for line in right_sections[right_name].splitlines()],
                 'similarity': 0.0
             }
     
@@ -212,40 +435,14 @@ def generate_resume_diff_html(section_comparisons, left_filename, right_filename
 
 def extract_skills_from_resume(text):
     """
-    Extract skills from resume text using common skill keywords
-    """
-    # Common technical skills
-    tech_skills = [
-        'python', 'java', 'javascript', 'c\+\+', 'c#', 'ruby', 'php', 'swift', 'kotlin',
-        'html', 'css', 'sql', 'nosql', 'react', 'angular', 'vue', 'node', 'django', 'flask',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'jira', 'agile',
-        'machine learning', 'ai', 'data science', 'big data', 'hadoop', 'spark', 'tableau',
-        'power bi', 'excel', 'word', 'powerpoint', 'photoshop', 'illustrator', 'figma',
-        'ui/ux', 'scrum', 'devops', 'ci/cd', 'rest api', 'graphql', 'microservices'
-    ]
-    
-    # Common soft skills
-    soft_skills = [
-        'communication', 'leadership', 'teamwork', 'problem solving', 'critical thinking',
-        'time management', 'organization', 'creativity', 'adaptability', 'flexibility',
-        'project management', 'attention to detail', 'analytical', 'interpersonal',
-        'negotiation', 'presentation', 'public speaking', 'writing', 'research', 'planning'
-    ]
-    
-    # Combine all skills
-    all_skills = tech_skills + soft_skills
-    
-    # Find skills in the text
-    found_skills = []
-    for skill in all_skills:
-        if re.search(r'\b' + skill + r'\b', text.lower()):
-            found_skills.append(skill)
-    
-    return found_skills
+    Extract skills from resume text or a ResumeDocument using the skill taxonomy
+    Aliases are reported under their canonical skill name.
+    """
+    return as_resume_document(text).skills(RESUME_CATEGORIES)
 
 def compare_resume_skills(left_text, right_text):
     """
-    Compare skills between two resumes
+    Compare skills between two resumes, given as text or ResumeDocuments
     """
     left_skills = set(extract_skills_from_resume(left_text))
     right_skills = set(extract_skills_from_resume(right_text))
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from utils.cache_utils import content_hash
+from utils.diff_utils import get_diff_lines
+from utils.document_utils import extract_text_from_file, is_extraction_error
+from utils.jd_utils import analyze_jd, analyze_jds
+from utils.metrics_utils import latency_snapshot
+from utils.pool_utils import POOL_WORKERS, get_process_pool, shutdown_process_pool
+from utils.resume_utils import compare_resume_sections
+
+# The service only listens on the loopback interface unless told otherwise
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Request bodies larger than this are rejected with 413
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+# Distinct jobs allowed in flight at once; further requests are rejected with 503
+MAX_PENDING_JOBS = POOL_WORKERS * 8
+
+# Bodies at least this large are parsed and hashed on a thread rather than on the event loop
+INLINE_BODY_BYTES = 256 * 1024
+
+# Seconds allowed for reading a request, and for a job to finish (504 after that)
+READ_TIMEOUT = 30
+JOB_TIMEOUT = 120
+
+class ServiceError(Exception):
+    """
+    An error reported to the client with an HTTP status
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _diff_job(left, right):
+    return [list(line) for line in get_diff_lines(left, right)]
+
+def _resume_sections_job(left, right):
+    # Already in a pool worker, so sections are diffed here rather than in a nested pool
+    return compare_resume_sections(left, right, parallel=False)
+
+def _json_body(body):
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Request body must be JSON")
+    if not isinstance(payload, dict):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+    return payload
+
+def _parse_json_job(endpoint, body):
+    """
+    Parse a JSON request body and compute its job key
+    """
+    return _json_body(body), content_hash(endpoint, body)
+
+def _text_field(payload, name):
+    value = payload.get(name)
+    if not isinstance(value, str):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"'{name}' must be a string")
+    return value
+
+class DiffService:
+    """
+    Local HTTP API over the diff, extraction, resume and job description engines
+    Requests are parsed on an asyncio event loop and CPU-bound work runs in the shared
+    process pool. Identical requests already in flight share one job, keyed by a content
+    hash of the endpoint and body. Bodies over max_body_bytes get 413, and requests that
+    would exceed max_pending distinct jobs get 503.
+    """
+
+    def __init__(self, max_body_bytes=MAX_BODY_BYTES, max_pending=MAX_PENDING_JOBS, job_timeout=JOB_TIMEOUT):
+        self.max_body_bytes = max_body_bytes
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self._in_flight = {}
+        self._io_executor = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix='service-io')
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/diff'): self.diff,
+            ('POST', '/extract'): self.extract,
+            ('POST', '/resume/sections'): self.resume_sections,
+            ('POST', '/jd/analyze'): self.analyze_jd
+        }
+
+    async def run_job(self, key, func, *args, executor=None):
+        """
+        Run func(*args) in an executor (the process pool by default), sharing the job
+        with any identical request already in flight
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            if len(self._in_flight) >= self.max_pending:
+                raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many requests in progress, retry later")
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(loop.run_in_executor(executor or get_process_pool(), func, *args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._in_flight.pop(key, None))
+        try:
+            # Shielded, so a client that gives up doesn't cancel the job for others
+            return await asyncio.wait_for(asyncio.shield(task), self.job_timeout)
+        except asyncio.TimeoutError:
+            raise ServiceError(HTTPStatus.GATEWAY_TIMEOUT, "Job did not finish in time")
+
+    async def off_loop(self, body, func, *args):
+        """
+        Run func(*args) directly for small bodies, or on the I/O thread pool for bodies
+        large enough that parsing or hashing them would stall the event loop
+        """
+        if len(body) < INLINE_BODY_BYTES:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._io_executor, func, *args)
+
+    async def health(self, query, body):
+        return {'status': 'ok', 'in_flight': len(self._in_flight), 'max_pending': self.max_pending, 'latency': latency_snapshot()}
+
+    async def diff(self, query, body):
+        """
+        {"left": text, "right": text} -> {"lines": [[tag, left, right, left_num, right_num], ...]}
+        """
+        payload, key = await self.off_loop(body, _parse_json_job, 'diff', body)
+        left, right = _text_field(payload, 'left'), _text_field(payload, 'right')
+        lines = await self.run_job(key, _diff_job, left, right)
+        return {'lines': lines}
+
+    async def extract(self, query, body):
+        """
+        Raw file bytes, with ?filename=name.ext -> {"filename": name, "text": text}
+        Office documents are already extracted in isolated worker processes, so this job
+        runs on a thread rather than in the process pool. Documents that fail to extract get 422.
+        """
+        filename = (query.get('filename') or [''])[0]
+        if not filename:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The 'filename' query parameter is required")
+        key = await self.off_loop(body, content_hash, 'extract', filename, body)
+        text = await self.run_job(key, extract_text_from_file, body, filename, executor=self._io_executor)
+        if text is None:
+            raise ServiceError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"{filename} appears to be binary or unsupported")
+        if is_extraction_error(text):
+            raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, text)
+        return {'filename': filename, 'text': text}
+
+    async def resume_sections(self, query, body):
+        """
+        {"left": text, "right": text} -> {"sections": section comparisons}
+        """
+        payload, key = await self.off_loop(body, _parse_json_job, 'resume_sections', body)
+        left, right = _text_field(payload, 'left'), _text_field(payload, 'right')
+        sections = await self.run_job(key, _resume_sections_job, left, right)
+        return {'sections': sections}
+
+    async def analyze_jd(self, query, body):
+        """
+        {"text": text} -> analysis, or {"texts": [text, ...]} ->
+        {"results": [analysis, ...], "count": n, "seconds": s, "jds_per_second": r}
+        Batches run on a thread, since analyze_batch spreads large batches across the
+        process pool itself.
+        """
+        payload, key = await self.off_loop(body, _parse_json_job, 'jd', body)
+        if 'texts' in payload:
+            texts = payload['texts']
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "'texts' must be a list of strings")
+            return await self.run_job(key, analyze_jds, texts, executor=self._io_executor)
+        return await self.run_job(key, analyze_jd, _text_field(payload, 'text'))
+
+    async def read_request(self, reader):
+        """
+        Read one HTTP/1.1 request; returns (method, path, query, body)
+        """
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        method, target, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body exceeds {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        return method.upper(), url.path, parse_qs(url.query), body
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve one request per connection and close it
+        """
+        try:
+            try:
+                try:
+                    method, path, query, body = await asyncio.wait_for(self.read_request(reader), READ_TIMEOUT)
+                except ValueError:
+                    # StreamReader.readline raises ValueError for lines over the stream limit
+                    raise ServiceError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request line or header too long")
+                handler = self.routes.get((method, path))
+                if handler is None:
+                    known_path = any(route_path == path for _, route_path in self.routes)
+                    raise ServiceError(HTTPStatus.METHOD_NOT_ALLOWED if known_path else HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+                status, payload = HTTPStatus.OK, await handler(query, body)
+            except ServiceError as e:
+                status, payload = e.status, {'error': e.message}
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                status, payload = HTTPStatus.REQUEST_TIMEOUT, {'error': "Incomplete request"}
+            except Exception as e:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+
+            data = json.dumps(payload).encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        """
+        Stop the service's I/O threads and the shared process pool
+        """
+        self._io_executor.shutdown(wait=False, cancel_futures=True)
+        shutdown_process_pool()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Listen for requests until cancelled
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            print(f"Diff service listening on http://{host}:{port}")
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m utils.service', description="Serve the diff engine over a local HTTP API")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING_JOBS, help="jobs allowed in flight before answering 503")
+    parser.add_argument('--max-body', type=int, default=MAX_BODY_BYTES, help="largest accepted request body, in bytes")
+    args = parser.parse_args(argv)
+
+    service = DiffService(max_body_bytes=args.max_body, max_pending=args.max_pending)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == '__main__':
+    main()
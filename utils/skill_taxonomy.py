@@ -0,0 +1,182 @@
+import argparse
+import csv
+import hashlib
+import os
+import pickle
+import threading
+
+from utils.cache_utils import content_hash
+from utils.keyword_matcher import KeywordMatcher, tokenize
+
+# Taxonomy shipped with the application; set SKILL_TAXONOMY_PATH to plug in a larger one
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.csv')
+TAXONOMY_PATH_ENV = 'SKILL_TAXONOMY_PATH'
+
+# Compiled indexes are written to a per-user cache directory, never next to the source;
+# set SKILL_INDEX_DIR to use another directory
+INDEX_DIR_ENV = 'SKILL_INDEX_DIR'
+DEFAULT_INDEX_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'diffchecker')
+INDEX_SUFFIX = '.idx'
+
+# Layout of the pickled index; bump when KeywordMatcher or SkillTaxonomy change shape
+INDEX_SCHEMA = 2
+
+# Categories used by resume skill extraction and by job description analysis.
+# 'jd_technical' skills are names that are also ordinary words (rust, swift): they are
+# looked for as job description requirements, but not listed from resume prose.
+RESUME_CATEGORIES = ('technical', 'soft')
+JD_CATEGORIES = ('technical', 'jd_technical', 'domain')
+
+class SkillTaxonomy:
+    """
+    Canonical skills with their categories and aliases, backed by a prebuilt KeywordMatcher
+    Every alias of a skill is reported under the skill's canonical name.
+    """
+
+    def __init__(self, categories, matcher):
+        self.categories = categories
+        self.matcher = matcher
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Build a taxonomy from (skill, category, aliases) entries
+        """
+        categories = {}
+        keywords = []
+        for skill, category, aliases in entries:
+            categories.setdefault(skill, category)
+            keywords.append((skill, skill))
+            keywords.extend((alias, skill) for alias in aliases)
+        return cls(categories, KeywordMatcher(keywords))
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __contains__(self, skill):
+        return skill in self.categories
+
+    def skills(self, categories=None):
+        """
+        Return the canonical skills, optionally limited to some categories
+        """
+        return [skill for skill in self.matcher.labels if categories is None or self.categories[skill] in categories]
+
+    def find_all(self, text, categories=None):
+        """
+        Return the set of canonical skills mentioned in the text
+        """
+        return self.find_in_tokens(tokenize(text), categories)
+
+    def find_in_tokens(self, tokens, categories=None):
+        """
+        Return the set of canonical skills mentioned in an already tokenized text
+        """
+        found = self.matcher.find_in_tokens(tokens)
+        if categories is None:
+            return found
+        return {skill for skill in found if self.categories[skill] in categories}
+
+    def find_skills(self, text, categories=None):
+        """
+        Return the canonical skills mentioned in the text, in taxonomy order
+        """
+        found = self.find_all(text, categories)
+        return [skill for skill in self.matcher.labels if skill in found]
+
+def read_taxonomy_source(path):
+    """
+    Read a taxonomy CSV with 'skill', 'category' and '|'-separated 'aliases' columns
+    Returns a list of (skill, category, aliases) entries
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            skill = row['skill'].strip().lower()
+            if not skill:
+                continue
+            aliases = [alias.strip().lower() for alias in (row.get('aliases') or '').split('|') if alias.strip()]
+            entries.append((skill, (row.get('category') or 'technical').strip().lower(), aliases))
+    return entries
+
+def get_index_path(source_path):
+    """
+    Path of the compiled index for a taxonomy source file, in the index cache directory
+    The file name includes a hash of the source path, so taxonomies with the same name
+    in different directories get separate indexes.
+    """
+    source_path = os.path.abspath(source_path)
+    index_dir = os.environ.get(INDEX_DIR_ENV) or DEFAULT_INDEX_DIR
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    digest = hashlib.sha1(source_path.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(index_dir, f"{name}-{digest}{INDEX_SUFFIX}")
+
+def get_index_version(source_path):
+    """
+    Version of the compiled index for a taxonomy source: the index schema and a hash of
+    the source content, so an index is rebuilt whenever either changes
+    """
+    with open(source_path, 'rb') as f:
+        return content_hash(str(INDEX_SCHEMA), f.read())
+
+def compile_taxonomy(source_path, index_path=None, version=None):
+    """
+    Compile a taxonomy source file into an on-disk index and return the taxonomy
+    """
+    version = version or get_index_version(source_path)
+    taxonomy = SkillTaxonomy.from_entries(read_taxonomy_source(source_path))
+    index_path = index_path or get_index_path(source_path)
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump((version, taxonomy), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, index_path)
+    return taxonomy
+
+def load_taxonomy(source_path=None):
+    """
+    Load a taxonomy, using its compiled index when it matches the source
+    The index is (re)compiled when missing, or when the source content or index schema
+    changed; if it can't be written, the taxonomy is built in memory instead.
+    """
+    source_path = source_path or os.environ.get(TAXONOMY_PATH_ENV) or DEFAULT_TAXONOMY_PATH
+    index_path = get_index_path(source_path)
+    version = get_index_version(source_path)
+
+    try:
+        with open(index_path, 'rb') as f:
+            index_version, taxonomy = pickle.load(f)
+        if index_version == version:
+            return taxonomy
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        pass
+
+    try:
+        return compile_taxonomy(source_path, index_path, version)
+    except OSError:
+        return SkillTaxonomy.from_entries(read_taxonomy_source(source_path))
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+def get_taxonomy():
+    """
+    Get the process-wide skill taxonomy, loading it on first use
+    """
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = load_taxonomy()
+        return _taxonomy
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a skill taxonomy CSV into a prebuilt index")
+    parser.add_argument('source', nargs='?', default=DEFAULT_TAXONOMY_PATH, help="taxonomy CSV file")
+    parser.add_argument('-o', '--output', help="index file to write (defaults to the index cache directory)")
+    args = parser.parse_args()
+
+    taxonomy = compile_taxonomy(args.source, args.output)
+    print(f"Compiled {len(taxonomy)} skills into {args.output or get_index_path(args.source)}")
+
+if __name__ == '__main__':
+    main()
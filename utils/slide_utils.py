@@ -0,0 +1,236 @@
+import difflib
+import hashlib
+import html
+
+def slide_content_hash(text):
+    """
+    Hash slide text with whitespace normalized so cosmetic spacing changes don't count
+    """
+    normalized = ' '.join(text.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def slide_similarity(left_text, right_text, threshold=0.0):
+    """
+    Word-level similarity between two slides, over the whole slide text
+    A one-word edit in a one-line slide still scores close to 1. The cheap difflib upper
+    bounds are checked first; when one falls below threshold it is returned instead of
+    the exact ratio.
+    """
+    matcher = difflib.SequenceMatcher(None, left_text.split(), right_text.split(), autojunk=False)
+    upper_bound = matcher.real_quick_ratio()
+    if upper_bound < threshold or upper_bound == 0:
+        return upper_bound
+    upper_bound = matcher.quick_ratio()
+    if upper_bound < threshold or upper_bound == 0:
+        return upper_bound
+    return matcher.ratio()
+
+def align_slides(left_slides, right_slides, similarity_threshold=0.5):
+    """
+    Align two decks slide by slide
+    Slides are first paired by content hash, then remaining slides are paired by similarity.
+    Returns a list of (left_slide, right_slide, similarity, moved) tuples where either side may be None.
+    """
+    left_hashes = [slide_content_hash(slide['text']) for slide in left_slides]
+    right_hashes = [slide_content_hash(slide['text']) for slide in right_slides]
+
+    # Identical slides that kept their relative order
+    pairs = []
+    used_left = set()
+    used_right = set()
+    matcher = difflib.SequenceMatcher(None, left_hashes, right_hashes, autojunk=False)
+    for left_start, right_start, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            pairs.append((left_slides[left_start + offset], right_slides[right_start + offset], 1.0, False))
+            used_left.add(left_start + offset)
+            used_right.add(right_start + offset)
+
+    # Identical slides that were reordered
+    right_by_hash = {}
+    for i, slide_hash in enumerate(right_hashes):
+        if i not in used_right:
+            right_by_hash.setdefault(slide_hash, []).append(i)
+    for i, slide_hash in enumerate(left_hashes):
+        candidates = right_by_hash.get(slide_hash)
+        if i not in used_left and candidates:
+            j = candidates.pop(0)
+            pairs.append((left_slides[i], right_slides[j], 1.0, True))
+            used_left.add(i)
+            used_right.add(j)
+
+    # Pair the remaining slides greedily, most similar first
+    scored = []
+    for i, left in enumerate(left_slides):
+        if i in used_left:
+            continue
+        for j, right in enumerate(right_slides):
+            if j in used_right:
+                continue
+            score = slide_similarity(left['text'], right['text'], similarity_threshold)
+            if score >= similarity_threshold:
+                scored.append((-score, i, j))
+    scored.sort()
+
+    for negative_score, i, j in scored:
+        if i in used_left or j in used_right:
+            continue
+        used_left.add(i)
+        used_right.add(j)
+        pairs.append((left_slides[i], right_slides[j], -negative_score, False))
+
+    pairs.extend((slide, None, 0.0, False) for i, slide in enumerate(left_slides) if i not in used_left)
+    pairs.extend((None, slide, 0.0, False) for j, slide in enumerate(right_slides) if j not in used_right)
+
+    # Present in right deck order, with removed slides at their left position
+    pairs.sort(key=lambda pair: (pair[1]['index'] if pair[1] else pair[0]['index'], pair[1] is not None))
+    return pairs
+
+def compare_slides(left_slides, right_slides, similarity_threshold=0.5):
+    """
+    Compare two decks slide by slide
+    Only slides whose content changed are diffed.
+    Returns a list of dictionaries with the status, indices, slide IDs, similarity and diff of each slide.
+    """
+    comparisons = []
+    for left, right, similarity, moved in align_slides(left_slides, right_slides, similarity_threshold):
+        if left and right:
+            unchanged = similarity == 1.0
+            status = 'unchanged' if unchanged else 'changed'
+            if moved:
+                status = 'moved'
+            diff = [] if unchanged else list(difflib.Differ().compare(left['text'].splitlines(), right['text'].splitlines()))
+        elif left:
+            status = 'removed'
+            diff = [f"- {line}" for line in left['text'].splitlines()]
+        else:
+            status = 'added'
+            diff = [f"+ {line}" for line in right['text'].splitlines()]
+
+        comparisons.append({
+            'status': status,
+            'left_index': left['index'] if left else None,
+            'right_index': right['index'] if right else None,
+            'left_slide_id': left['slide_id'] if left else None,
+            'right_slide_id': right['slide_id'] if right else None,
+            'similarity': similarity,
+            'diff': diff
+        })
+
+    return comparisons
+
+def generate_slide_diff_html(slide_comparisons, left_filename, right_filename, show_unchanged=False):
+    """
+    Generate HTML representation of a slide-by-slide deck comparison
+    """
+    counts = {}
+    for comparison in slide_comparisons:
+        counts[comparison['status']] = counts.get(comparison['status'], 0) + 1
+
+    html_output = f"""
+    <style>
+        .slide-diff-container {{
+            font-family: Arial, sans-serif;
+            width: 100%;
+        }}
+        .slide-header {{
+            background-color: #f0f0f0;
+            padding: 10px;
+            margin-top: 20px;
+            font-weight: bold;
+            border-radius: 5px;
+        }}
+        .slide-status {{
+            float: right;
+            color: #666;
+        }}
+        .slide-content {{
+            padding: 10px;
+            border: 1px solid #ddd;
+            border-radius: 5px;
+            margin-top: 5px;
+            white-space: pre-wrap;
+            word-wrap: break-word;
+        }}
+        .slide-removed {{
+            background-color: #ffdddd;
+        }}
+        .slide-added {{
+            background-color: #ddffdd;
+        }}
+        .slide-moved {{
+            background-color: #f8f0dd;
+        }}
+        .diff-line {{
+            margin: 0;
+            padding: 2px 0;
+        }}
+        .diff-added {{
+            background-color: #ddffdd;
+        }}
+        .diff-removed {{
+            background-color: #ffdddd;
+        }}
+        .diff-unchanged {{
+            background-color: #f8f8f8;
+        }}
+        .slide-summary {{
+            margin-bottom: 20px;
+            padding: 10px;
+            background-color: #f8f8f8;
+            border-radius: 5px;
+        }}
+    </style>
+    <div class="slide-diff-container">
+        <h2>Slide Comparison</h2>
+        <div class="slide-summary">
+            <p><strong>Left Deck:</strong> {html.escape(left_filename)}</p>
+            <p><strong>Right Deck:</strong> {html.escape(right_filename)}</p>
+            <p><strong>Changed:</strong> {counts.get('changed', 0)}
+               &nbsp; <strong>Added:</strong> {counts.get('added', 0)}
+               &nbsp; <strong>Removed:</strong> {counts.get('removed', 0)}
+               &nbsp; <strong>Moved:</strong> {counts.get('moved', 0)}
+               &nbsp; <strong>Unchanged:</strong> {counts.get('unchanged', 0)}</p>
+        </div>
+    """
+
+    for comparison in slide_comparisons:
+        status = comparison['status']
+        if status == 'unchanged' and not show_unchanged:
+            continue
+
+        if comparison['left_index'] is not None and comparison['right_index'] is not None:
+            title = f"Slide {comparison['left_index'] + 1} &rarr; {comparison['right_index'] + 1}"
+        elif comparison['left_index'] is not None:
+            title = f"Slide {comparison['left_index'] + 1}"
+        else:
+            title = f"Slide {comparison['right_index'] + 1}"
+
+        if status == 'changed':
+            status_text = f"Similarity: {int(comparison['similarity'] * 100)}%"
+        else:
+            status_text = status.title()
+
+        html_output += f"""
+        <div class="slide-header slide-{status}">
+            {title}
+            <span class="slide-status">{status_text}</span>
+        </div>
+        """
+
+        if not comparison['diff']:
+            continue
+
+        html_output += '<div class="slide-content">'
+        for line in comparison['diff']:
+            if line.startswith('+ '):
+                html_output += f'<p class="diff-line diff-added">{html.escape(line)}</p>'
+            elif line.startswith('- '):
+                html_output += f'<p class="diff-line diff-removed">{html.escape(line)}</p>'
+            elif line.startswith('? '):
+                continue
+            else:
+                html_output += f'<p class="diff-line diff-unchanged">{html.escape(line[2:])}</p>'
+        html_output += "</div>"
+
+    html_output += "</div>"
+    return html_output
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import markdown
+
+# Directory holding the resume templates; set RESUME_TEMPLATE_DIR to use another one
+DEFAULT_TEMPLATE_DIR = "/home/ubuntu/resume_app/resources"
+TEMPLATE_DIR_ENV = 'RESUME_TEMPLATE_DIR'
+
+# Template file for each resume format
+TEMPLATE_FILES = {
+    "hr_focused": "hr_focused_resume.md",
+    "semi_technical": "semi_technical_resume.md",
+    "design_oriented": "design_oriented_resume.md",
+    "ai_architecture": "ai_architecture_resume.md"
+}
+
+class TemplateRegistry:
+    """
+    Resume templates loaded once, with their markdown precompiled to HTML
+    Templates are read on first use and then served from memory without touching the
+    disk. reload() checks the files' modification times and re-reads only the templates
+    that changed. Missing or unreadable templates are reported as error strings.
+    """
+
+    def __init__(self, template_dir=None, template_files=None):
+        self.template_dir = template_dir or os.environ.get(TEMPLATE_DIR_ENV) or DEFAULT_TEMPLATE_DIR
+        self.template_files = dict(template_files or TEMPLATE_FILES)
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self, format_type):
+        """
+        Load one template as a (mtime, text, html) entry
+        """
+        file_path = os.path.join(self.template_dir, self.template_files[format_type])
+        try:
+            mtime = os.path.getmtime(file_path)
+            entry = (self._entries or {}).get(format_type)
+            if entry is not None and entry[0] == mtime:
+                return entry
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            return (mtime, text, markdown.markdown(text))
+        except Exception as e:
+            text = f"Error loading template: {str(e)}"
+            return (None, text, markdown.markdown(text))
+
+    def reload(self):
+        """
+        Re-read every template whose file changed since it was loaded
+        """
+        with self._lock:
+            self._entries = {format_type: self._load(format_type) for format_type in self.template_files}
+
+    def _get_entries(self):
+        """
+        Return the loaded entries, loading the templates on first use
+        """
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = {format_type: self._load(format_type) for format_type in self.template_files}
+        return self._entries
+
+    def get(self, format_type):
+        """
+        Return the markdown text of one template
+        """
+        return self._get_entries()[format_type][1]
+
+    def get_html(self, format_type):
+        """
+        Return the precompiled HTML of one template
+        """
+        return self._get_entries()[format_type][2]
+
+    def templates(self):
+        """
+        Return the markdown text of every template, keyed by format
+        """
+        return {format_type: entry[1] for format_type, entry in self._get_entries().items()}
+
+    def loaded_templates(self):
+        """
+        Return (templates, errors): the markdown text of every template that loaded and the
+        error message of every template that didn't, each keyed by format
+        """
+        entries = self._get_entries()
+        templates = {format_type: entry[1] for format_type, entry in entries.items() if entry[0] is not None}
+        errors = {format_type: entry[1] for format_type, entry in entries.items() if entry[0] is None}
+        return templates, errors
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_template_registry():
+    """
+    Get the process-wide TemplateRegistry, creating it on first use
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TemplateRegistry()
+        return _registry